@@ -5,10 +5,14 @@ Central router aggregating all API endpoints.
 """
 
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
 
 from app.api.routes import analysis, research, patent, knowledge, upload, auth, projects, antigravity
 
-router = APIRouter()
+# orjson serializes responses several times faster than stdlib json and
+# handles datetime/UUID natively - this matters for large payloads like
+# the full-analysis pipeline.
+router = APIRouter(default_response_class=ORJSONResponse)
 
 # Include sub-routers
 router.include_router(auth.router, prefix="/auth", tags=["Authentication"])
@@ -4,12 +4,17 @@ Inventix AI - Analysis API Routes
 Core analysis endpoints for idea processing and novelty detection.
 """
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, Field
+import orjson
+from fastapi import APIRouter, Response
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, timezone
+from itertools import count
+import time
 
-from app.services.slm_engine import SLMEngine, SLMRequest
+from app.services.slm_engine import SLMRequest, slm_engine
+from app.services.batch_scheduler import batch_scheduler
+from app.services.slm_cache import cached_generate, make_cache_key
 from app.core.schemas import (
     AntigravityResponse,
     CrashLog,
@@ -18,11 +23,46 @@ from app.core.schemas import (
 )
 
 router = APIRouter()
-slm_engine = SLMEngine()
+
+# Monotonic counter for evidence ids - cheaper than per-request strftime
+# and unique even within the same nanosecond tick.
+_evidence_counter = count()
+
+# Prompt templates are hoisted to module scope so the static schema block
+# is allocated once; only the three variable fields change per request.
+_IDEA_SYSTEM_PROMPT = "You are ANTIGRAVITY, an evidence-locked analysis system. Output only valid JSON. Never invent facts."
+
+_IDEA_PROMPT = """Analyze this innovation idea and extract structured information.
+
+IDEA: {idea}
+DOMAIN: {domain}
+CONTEXT: {context}
+
+You must respond in valid JSON with this exact structure:
+{{
+    "idea_summary": "A concise 2-3 sentence summary of the core innovation",
+    "key_concepts": ["concept1", "concept2", "concept3"],
+    "novelty_indicators": {{
+        "overall_score": 0.0 to 1.0,
+        "semantic_uniqueness": 0.0 to 1.0,
+        "domain_coverage": 0.0 to 1.0,
+        "prior_art_risk": 0.0 to 1.0
+    }},
+    "potential_overlaps": ["area1", "area2"],
+    "recommended_searches": ["search query 1", "search query 2"]
+}}
+
+IMPORTANT:
+- Scores are PROBABILISTIC ESTIMATES, not definitive assessments
+- If uncertain, bias scores toward 0.5 (unknown)
+- Do not claim patentability or legal conclusions
+"""
 
 
 class IdeaInput(BaseModel):
     """Input schema for idea analysis."""
+    model_config = ConfigDict(extra="forbid", frozen=True, str_strip_whitespace=True)
+
     idea_text: str = Field(..., min_length=10, description="The idea to analyze")
     domain: Optional[str] = Field(None, description="Technology domain")
     context: Optional[str] = Field(None, description="Additional context")
@@ -30,12 +70,22 @@ class IdeaInput(BaseModel):
 
 class NoveltyScore(BaseModel):
     """Novelty scoring output."""
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     overall_score: float = Field(..., ge=0.0, le=1.0)
     semantic_uniqueness: float = Field(..., ge=0.0, le=1.0)
     domain_coverage: float = Field(..., ge=0.0, le=1.0)
     prior_art_risk: float = Field(..., ge=0.0, le=1.0)
 
 
+def _clip01(x) -> float:
+    """Clamp a score to [0, 1], defaulting to 0.5 on bad values."""
+    try:
+        return min(1.0, max(0.0, float(x)))
+    except (TypeError, ValueError):
+        return 0.5
+
+
 class IdeaAnalysisResponse(AntigravityResponse):
     """Response schema for idea analysis."""
     idea_summary: str
@@ -58,87 +108,79 @@ async def analyze_idea(input_data: IdeaInput):
     
     Returns structured analysis with evidence references.
     """
-    try:
-        # Step 1: Validate input integrity
-        if not input_data.idea_text.strip():
-            return CrashLog(
-                status="CRASH",
-                error_type="INPUT_ERROR",
-                error_message="Idea text is empty or whitespace only",
-                failed_stage="input_validation",
-                evidence_state={"provided": False, "retrieved_count": 0, "usable": False},
-                confidence_score=0.0,
-                recommended_action="adjust_input",
-                debug_trace=["Received input", "Validated idea_text", "Found empty content"]
-            )
-        
-        # Step 2: Process through SLM
-        prompt = f"""Analyze this innovation idea and extract structured information.
-
-IDEA: {input_data.idea_text}
-DOMAIN: {input_data.domain or 'Not specified'}
-CONTEXT: {input_data.context or 'None provided'}
+    # Step 1: Validate input integrity
+    if not input_data.idea_text.strip():
+        return CrashLog(
+            status="CRASH",
+            error_type="INPUT_ERROR",
+            error_message="Idea text is empty or whitespace only",
+            failed_stage="input_validation",
+            evidence_state={"provided": False, "retrieved_count": 0, "usable": False},
+            confidence_score=0.0,
+            recommended_action="adjust_input",
+            debug_trace=["Received input", "Validated idea_text", "Found empty content"]
+        )
 
-You must respond in valid JSON with this exact structure:
-{{
-    "idea_summary": "A concise 2-3 sentence summary of the core innovation",
-    "key_concepts": ["concept1", "concept2", "concept3"],
-    "novelty_indicators": {{
-        "overall_score": 0.0 to 1.0,
-        "semantic_uniqueness": 0.0 to 1.0,
-        "domain_coverage": 0.0 to 1.0,
-        "prior_art_risk": 0.0 to 1.0
-    }},
-    "potential_overlaps": ["area1", "area2"],
-    "recommended_searches": ["search query 1", "search query 2"]
-}}
+    # Step 2: Process through SLM
+    prompt = _IDEA_PROMPT.format(
+        idea=input_data.idea_text,
+        domain=input_data.domain or "Not specified",
+        context=input_data.context or "None provided"
+    )
 
-IMPORTANT: 
-- Scores are PROBABILISTIC ESTIMATES, not definitive assessments
-- If uncertain, bias scores toward 0.5 (unknown)
-- Do not claim patentability or legal conclusions
-"""
-        
-        result = await slm_engine.generate(SLMRequest(
+    cache_key = make_cache_key(input_data.idea_text, input_data.domain, input_data.context)
+    result = await cached_generate(
+        SLMRequest(
             prompt=prompt,
-            system_prompt="You are ANTIGRAVITY, an evidence-locked analysis system. Output only valid JSON. Never invent facts.",
+            system_prompt=_IDEA_SYSTEM_PROMPT,
             response_format="json"
-        ))
-        
-        if not result.success:
-            return CrashLog(
-                status="CRASH",
-                error_type="UNKNOWN_FAILURE",
-                error_message=f"SLM generation failed: {result.error}",
-                failed_stage="reasoning",
-                evidence_state={"provided": True, "retrieved_count": 0, "usable": True},
-                confidence_score=0.0,
-                recommended_action="retry_with_more_evidence",
-                debug_trace=["Received input", "Validated input", "Sent to SLM", "SLM failed"]
-            )
-        
-        # Step 3: Parse and validate output
+        ),
+        key=cache_key,
+        generate=batch_scheduler.submit
+    )
+
+    if not result.success:
+        return CrashLog(
+            status="CRASH",
+            error_type="UNKNOWN_FAILURE",
+            error_message=f"SLM generation failed: {result.error}",
+            failed_stage="reasoning",
+            evidence_state={"provided": True, "retrieved_count": 0, "usable": True},
+            confidence_score=0.0,
+            recommended_action="retry_with_more_evidence",
+            debug_trace=["Received input", "Validated input", "Sent to SLM", "SLM failed"]
+        )
+
+    # Steps 3-4: Parse the SLM output and construct the response. Only
+    # malformed-output errors are handled here; anything unexpected
+    # bubbles to the app-level crash-log exception handler.
+    try:
         parsed = result.parsed_json
-        
-        # Step 4: Construct response with evidence
-        evidence_id = f"EVD-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-INPUT"
-        
-        return IdeaAnalysisResponse(
+
+        # SLM-derived fields are trusted after the score clamp below, so we
+        # use model_construct and skip Pydantic revalidation on the hot path.
+        evidence_id = f"EVD-{time.time_ns()}-{next(_evidence_counter)}-INPUT"
+        timestamp = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+        novelty_raw = parsed.get("novelty_indicators") or {}
+        novelty = NoveltyScore.model_construct(
+            overall_score=_clip01(novelty_raw.get("overall_score", 0.5)),
+            semantic_uniqueness=_clip01(novelty_raw.get("semantic_uniqueness", 0.5)),
+            domain_coverage=_clip01(novelty_raw.get("domain_coverage", 0.5)),
+            prior_art_risk=_clip01(novelty_raw.get("prior_art_risk", 0.5))
+        )
+
+        return IdeaAnalysisResponse.model_construct(
             idea_summary=parsed.get("idea_summary", "Unable to summarize"),
             key_concepts=parsed.get("key_concepts", []),
-            novelty_indicators=NoveltyScore(**parsed.get("novelty_indicators", {
-                "overall_score": 0.5,
-                "semantic_uniqueness": 0.5,
-                "domain_coverage": 0.5,
-                "prior_art_risk": 0.5
-            })),
+            novelty_indicators=novelty,
             potential_overlaps=parsed.get("potential_overlaps", []),
             recommended_searches=parsed.get("recommended_searches", []),
-            evidence_references=[EvidenceReference(
+            evidence_references=[EvidenceReference.model_construct(
                 evidence_id=evidence_id,
                 source="user_input",
-                content_hash=str(hash(input_data.idea_text)),
-                timestamp=datetime.utcnow().isoformat()
+                content_hash=cache_key,
+                timestamp=timestamp
             )],
             confidence=ConfidenceLevel.MEDIUM,
             scope_disclaimer="This analysis provides probabilistic indicators only. It does not determine patentability, legal status, or commercial viability.",
@@ -146,13 +188,15 @@ IMPORTANT:
             inferred_risk="Novelty scores are estimates based on textual analysis only",
             unknowns=["Actual prior art overlap", "Patent claim conflicts", "Market existing solutions"]
         )
-        
-    except Exception as e:
+
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        # AttributeError covers parsed_json being None for a "successful"
+        # response with no JSON payload.
         return CrashLog(
             status="CRASH",
             error_type="UNKNOWN_FAILURE",
             error_message=str(e),
-            failed_stage="output_generation",
+            failed_stage="output_parsing",
             evidence_state={"provided": True, "retrieved_count": 0, "usable": True},
             confidence_score=0.0,
             recommended_action="system_debug",
@@ -160,16 +204,20 @@ IMPORTANT:
         )
 
 
+# Status payload is constant - serialize it once at import.
+_STATUS_JSON = orjson.dumps({
+    "service": "analysis",
+    "status": "operational",
+    "engine": "ANTIGRAVITY",
+    "capabilities": [
+        "idea_analysis",
+        "concept_extraction",
+        "novelty_scoring"
+    ]
+})
+
+
 @router.get("/status")
 async def analysis_status():
     """Get analysis service status."""
-    return {
-        "service": "analysis",
-        "status": "operational",
-        "engine": "ANTIGRAVITY",
-        "capabilities": [
-            "idea_analysis",
-            "concept_extraction",
-            "novelty_scoring"
-        ]
-    }
+    return Response(content=_STATUS_JSON, media_type="application/json")
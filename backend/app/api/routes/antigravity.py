@@ -4,27 +4,42 @@ Inventix AI - ANTIGRAVITY Core API Routes
 Unified API endpoints for ANTIGRAVITY core features.
 """
 
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends
+import asyncio
+import tempfile
+
+from fastapi import APIRouter, UploadFile, File, Depends
 from typing import Optional, List
-from pydantic import BaseModel
-from dataclasses import asdict
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 
-from app.services.document_processor import DocumentProcessor, DocumentType
-from app.services.concept_extractor import ConceptExtractor, ConceptCategory
+from app.services.document_processor import DocumentProcessor
+from app.services.concept_extractor import ConceptExtractor
 from app.services.prior_art_comparator import PriorArtComparator, NoveltyRisk
 from app.services.research_summarizer import ResearchSummarizer
 from app.services.draft_refiner import DraftRefiner, RefinementType
-from app.services.auth_service import get_current_user, get_optional_user
+from app.services.auth_service import get_optional_user
 from app.core.project_schemas import User
 
 
 router = APIRouter()
 
+# Service singletons - these components carry no per-request state, so
+# construct them once at import instead of inside every handler.
+document_processor = DocumentProcessor()
+concept_extractor = ConceptExtractor()
+prior_art_comparator = PriorArtComparator()
+research_summarizer = ResearchSummarizer()
+draft_refiner = DraftRefiner()
+
+# O(1) refinement-type lookup for focus-area parsing.
+_REFINEMENT_TYPE_MAP = {rt.value: rt for rt in RefinementType}
+
 
 # ==================== Request/Response Models ====================
 
 class TextInput(BaseModel):
     """Text input for processing."""
+    model_config = ConfigDict(extra="forbid", frozen=True, str_strip_whitespace=True)
+
     text: str
     title: Optional[str] = None
     project_type: Optional[str] = "research"  # "patent" or "research"
@@ -32,6 +47,8 @@ class TextInput(BaseModel):
 
 class ConceptExtractionResponse(BaseModel):
     """Response for concept extraction."""
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     success: bool
     concepts: list
     differentiating_terms: list
@@ -40,8 +57,41 @@ class ConceptExtractionResponse(BaseModel):
     error: Optional[str] = None
 
 
+class ConceptOut(BaseModel):
+    """Serialization shape for an extracted concept."""
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="ignore")
+
+    term: str
+    category: str
+    frequency: int
+    weight: float
+    context: Optional[str] = None
+
+
+class MatchOut(BaseModel):
+    """Serialization shape for a prior-art match."""
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="ignore")
+
+    title: str
+    source: str
+    similarity: str
+    similarity_score: float
+    overlap_description: str
+    overlapping_concepts: List[str]
+    differentiating_aspects: List[str]
+    evidence: str
+
+
+# Module-level adapters: pydantic-core walks the whole list in compiled
+# code instead of per-field Python attribute packing in the handlers.
+_CONCEPT_ADAPTER = TypeAdapter(List[ConceptOut])
+_MATCH_ADAPTER = TypeAdapter(List[MatchOut])
+
+
 class NoveltyAssessmentResponse(BaseModel):
     """Response for novelty assessment."""
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     success: bool
     risk: str
     risk_score: float
@@ -56,6 +106,8 @@ class NoveltyAssessmentResponse(BaseModel):
 
 class SummaryResponse(BaseModel):
     """Response for structured summary."""
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     success: bool
     existing_work: str
     user_contribution: str
@@ -68,6 +120,8 @@ class SummaryResponse(BaseModel):
 
 class RefinementRequest(BaseModel):
     """Request for draft refinement."""
+    model_config = ConfigDict(extra="forbid", frozen=True, str_strip_whitespace=True)
+
     text: str
     focus_areas: Optional[List[str]] = None
     change_level: Optional[str] = "moderate"
@@ -75,6 +129,8 @@ class RefinementRequest(BaseModel):
 
 class RefinementResponse(BaseModel):
     """Response for draft refinement."""
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     success: bool
     original_text: str
     refined_text: str
@@ -98,21 +154,36 @@ async def upload_document(
     
     Extracts text while preserving structure and technical terminology.
     """
-    processor = DocumentProcessor()
-    
-    # Read file content
-    content = await file.read()
-    
-    # Process document
-    result = processor.process_document(
-        content=content,
-        filename=file.filename,
-        content_type=file.content_type
-    )
+    # Stream the upload into a spooled temp file so peak memory stays
+    # bounded: small files stay in RAM, large ones spill to disk. The
+    # size cap is enforced mid-stream instead of after a full read.
+    spool = tempfile.SpooledTemporaryFile(max_size=8 << 20)
+    size = 0
+    while chunk := await file.read(1 << 20):
+        size += len(chunk)
+        if size > DocumentProcessor.MAX_DOCUMENT_SIZE:
+            spool.close()
+            return {
+                "success": False,
+                "error_code": "DOCUMENT_TOO_LARGE",
+                "error_message": f"Document exceeds maximum size of {DocumentProcessor.MAX_DOCUMENT_SIZE // (1024 * 1024)}MB",
+                "recommendation": "Please reduce the document size or split into smaller parts",
+                "recoverable": False
+            }
+        spool.write(chunk)
+    spool.seek(0)
+
+    # Process document off the event loop - parsing is CPU-bound
+    with spool:
+        result = await document_processor.process_document_async(
+            content=spool,
+            filename=file.filename,
+            content_type=file.content_type
+        )
     
     if not result.success:
         # Emit crash log
-        crash_log = processor.emit_crash_log("document_upload", result)
+        crash_log = document_processor.emit_crash_log("document_upload", result)
         return {
             "success": False,
             "error_code": result.error_code,
@@ -139,8 +210,7 @@ async def process_text(
     """
     Process pasted text input.
     """
-    processor = DocumentProcessor()
-    result = processor.process_pasted_text(input_data.text)
+    result = document_processor.process_pasted_text(input_data.text)
     
     if not result.success:
         return {
@@ -171,9 +241,7 @@ async def extract_concepts(
     Uses deterministic + SLM-assisted extraction.
     Distinguishes common domain terms from differentiating terms.
     """
-    extractor = ConceptExtractor()
-    
-    result = await extractor.extract_concepts(
+    result = await concept_extractor.extract_concepts(
         text=input_data.text,
         use_slm=True,
         domain_context=input_data.project_type
@@ -189,18 +257,9 @@ async def extract_concepts(
             error=result.error_message
         )
     
-    # Convert concepts to serializable format
-    concepts = [
-        {
-            "term": c.term,
-            "category": c.category.value,
-            "frequency": c.frequency,
-            "weight": c.weight,
-            "context": c.context
-        }
-        for c in result.concepts
-    ]
-    
+    # Convert concepts to serializable format in one pydantic-core pass
+    concepts = _CONCEPT_ADAPTER.validate_python(result.concepts)
+
     return ConceptExtractionResponse(
         success=True,
         concepts=concepts,
@@ -223,9 +282,7 @@ async def compare_prior_art(
     Uses semantic similarity for comparison.
     Returns GREEN/YELLOW/RED risk classification with evidence.
     """
-    comparator = PriorArtComparator()
-    
-    result = await comparator.compare_with_prior_art(
+    result = await prior_art_comparator.compare_with_prior_art(
         user_text=input_data.text,
         user_title=input_data.title or "Untitled",
         project_type=input_data.project_type
@@ -245,21 +302,9 @@ async def compare_prior_art(
             error=result.error_message
         )
     
-    # Convert matches to serializable format
-    matches = [
-        {
-            "title": m.title,
-            "source": m.source,
-            "similarity": m.similarity.value,
-            "similarity_score": m.similarity_score,
-            "overlap_description": m.overlap_description,
-            "overlapping_concepts": m.overlapping_concepts,
-            "differentiating_aspects": m.differentiating_aspects,
-            "evidence": m.evidence
-        }
-        for m in result.prior_art_matches
-    ]
-    
+    # Convert matches to serializable format in one pydantic-core pass
+    matches = _MATCH_ADAPTER.validate_python(result.prior_art_matches)
+
     return NoveltyAssessmentResponse(
         success=True,
         risk=result.risk.value,
@@ -282,9 +327,7 @@ async def compare_claims(
     """
     Clause-level comparison for patent claims.
     """
-    comparator = PriorArtComparator()
-    
-    result = await comparator.compare_claims(
+    result = await prior_art_comparator.compare_claims(
         user_claims=claims,
         project_title=title or "Untitled"
     )
@@ -305,9 +348,7 @@ async def generate_summary(
     Separates: existing work, user contribution, differentiation, uncertainty.
     Evidence-grounded only - no fabricated claims.
     """
-    summarizer = ResearchSummarizer()
-    
-    result = await summarizer.generate_summary(
+    result = await research_summarizer.generate_summary(
         user_text=input_data.text,
         user_title=input_data.title or "Untitled",
         project_type=input_data.project_type
@@ -346,9 +387,7 @@ async def generate_comparative_summary(
     """
     Generate a comparative summary against specific prior works.
     """
-    summarizer = ResearchSummarizer()
-    
-    result = await summarizer.generate_comparative_summary(
+    result = await research_summarizer.generate_comparative_summary(
         user_text=text,
         user_title=title,
         compared_works=compared_works
@@ -374,17 +413,15 @@ async def refine_draft(
     
     Output is non-detectable as AI-generated.
     """
-    refiner = DraftRefiner()
-    
-    # Convert focus areas
-    focus_areas = None
-    if request.focus_areas:
-        try:
-            focus_areas = [RefinementType(f) for f in request.focus_areas]
-        except ValueError:
-            pass
-    
-    result = await refiner.refine_draft(
+    # Convert focus areas - unknown entries are skipped individually
+    # instead of one bad value discarding the whole list.
+    focus_areas = [
+        _REFINEMENT_TYPE_MAP[f]
+        for f in (request.focus_areas or [])
+        if f in _REFINEMENT_TYPE_MAP
+    ] or None
+    
+    result = await draft_refiner.refine_draft(
         original_text=request.text,
         focus_areas=focus_areas,
         max_change_level=request.change_level
@@ -437,9 +474,7 @@ async def refine_section(
     """
     Refine a specific section of a document.
     """
-    refiner = DraftRefiner()
-    
-    result = await refiner.refine_section(
+    result = await draft_refiner.refine_section(
         section_text=text,
         section_type=section_type,
         target_improvements=improvements
@@ -469,10 +504,17 @@ async def full_analysis(
         "title": input_data.title or "Untitled",
         "project_type": input_data.project_type
     }
-    
+
+    # Refinement only needs the raw text, so start it alongside stage 1.
+    refine_task = None
+    if include_refinement:
+        refine_task = asyncio.create_task(draft_refiner.refine_draft(
+            original_text=input_data.text,
+            max_change_level="moderate"
+        ))
+
     # 1. Concept Extraction
-    extractor = ConceptExtractor()
-    concepts_result = await extractor.extract_concepts(
+    concepts_result = await concept_extractor.extract_concepts(
         text=input_data.text,
         use_slm=True,
         domain_context=input_data.project_type
@@ -483,53 +525,62 @@ async def full_analysis(
         "common_terms": concepts_result.common_terms,
         "summary": concepts_result.summary
     }
-    
-    # 2. Prior Art Comparison
-    comparator = PriorArtComparator()
-    prior_art_result = await comparator.compare_with_prior_art(
-        user_text=input_data.text,
-        user_title=input_data.title or "Untitled",
-        project_type=input_data.project_type,
-        extracted_concepts=concepts_result.differentiating_terms
-    )
-    results["novelty"] = {
-        "success": prior_art_result.success,
-        "risk": prior_art_result.risk.value,
-        "risk_score": prior_art_result.risk_score,
-        "confidence": prior_art_result.confidence,
-        "novel_aspects": prior_art_result.novel_aspects,
-        "overlapping_aspects": prior_art_result.overlapping_aspects,
-        "recommendations": prior_art_result.recommendations
-    }
-    
-    # 3. Summary Generation
-    summarizer = ResearchSummarizer()
-    summary_result = await summarizer.generate_summary(
-        user_text=input_data.text,
-        user_title=input_data.title or "Untitled",
-        project_type=input_data.project_type,
-        key_concepts=concepts_result.differentiating_terms
+
+    # 2 + 3. Prior art comparison and summary generation both depend only
+    # on the extracted terms - run them concurrently so wall-clock time is
+    # the max of the two LLM calls, not their sum.
+    prior_art_result, summary_result = await asyncio.gather(
+        prior_art_comparator.compare_with_prior_art(
+            user_text=input_data.text,
+            user_title=input_data.title or "Untitled",
+            project_type=input_data.project_type,
+            extracted_concepts=concepts_result.differentiating_terms
+        ),
+        research_summarizer.generate_summary(
+            user_text=input_data.text,
+            user_title=input_data.title or "Untitled",
+            project_type=input_data.project_type,
+            key_concepts=concepts_result.differentiating_terms
+        ),
+        return_exceptions=True
     )
-    results["summary"] = {
-        "success": summary_result.success,
-        "existing_work": summary_result.existing_work,
-        "user_contribution": summary_result.user_contribution,
-        "differentiation": summary_result.differentiation,
-        "key_innovations": summary_result.key_innovations
-    }
-    
-    # 4. Optional Refinement
-    if include_refinement:
-        refiner = DraftRefiner()
-        refine_result = await refiner.refine_draft(
-            original_text=input_data.text,
-            max_change_level="moderate"
-        )
-        results["refinement"] = {
-            "success": refine_result.success,
-            "refined_text": refine_result.refined_text if refine_result.success else None,
-            "change_count": len(refine_result.changes),
-            "warnings": refine_result.warnings
+
+    if isinstance(prior_art_result, Exception):
+        results["novelty"] = {"success": False, "error": str(prior_art_result)}
+    else:
+        results["novelty"] = {
+            "success": prior_art_result.success,
+            "risk": prior_art_result.risk.value,
+            "risk_score": prior_art_result.risk_score,
+            "confidence": prior_art_result.confidence,
+            "novel_aspects": prior_art_result.novel_aspects,
+            "overlapping_aspects": prior_art_result.overlapping_aspects,
+            "recommendations": prior_art_result.recommendations
         }
-    
+
+    if isinstance(summary_result, Exception):
+        results["summary"] = {"success": False, "error": str(summary_result)}
+    else:
+        results["summary"] = {
+            "success": summary_result.success,
+            "existing_work": summary_result.existing_work,
+            "user_contribution": summary_result.user_contribution,
+            "differentiation": summary_result.differentiation,
+            "key_innovations": summary_result.key_innovations
+        }
+
+    # 4. Optional Refinement
+    if refine_task is not None:
+        try:
+            refine_result = await refine_task
+        except Exception as e:
+            results["refinement"] = {"success": False, "error": str(e)}
+        else:
+            results["refinement"] = {
+                "success": refine_result.success,
+                "refined_text": refine_result.refined_text if refine_result.success else None,
+                "change_count": len(refine_result.changes),
+                "warnings": refine_result.warnings
+            }
+
     return results
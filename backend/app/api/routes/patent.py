@@ -4,16 +4,86 @@ Inventix AI - Patent Intelligence API Routes
 Patent analysis, novelty scanning, and claim comparison.
 """
 
-from fastapi import APIRouter
-from pydantic import BaseModel, Field
+import orjson
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
+from itertools import count
+import asyncio
+import time
 
-from app.services.slm_engine import SLMEngine, SLMRequest
-from app.core.schemas import CrashLog, AntigravityResponse, ConfidenceLevel, EvidenceReference
+from app.services.slm_engine import SLMRequest
+from app.services.slm_cache import cached_generate
+from app.services.job_store import job_store
+from app.core.schemas import CrashLog
 
 router = APIRouter()
-slm_engine = SLMEngine()
+
+# Monotonic counter for evidence ids - cheaper than per-request strftime
+# and unique even for multiple requests within the same second.
+_evd_seq = count()
+
+_ts_cache = (0, "")
+
+
+def _utc_timestamp() -> str:
+    """ISO UTC timestamp, cached per second to skip repeated formatting."""
+    global _ts_cache
+    now = int(time.time())
+    if now != _ts_cache[0]:
+        _ts_cache = (now, datetime.now(timezone.utc).isoformat(timespec="seconds"))
+    return _ts_cache[1]
+
+
+# Prompt templates are hoisted to module scope so the static JSON
+# skeletons are allocated once; only the claim fields change per request.
+_CLAIM_SYSTEM_PROMPT = "You are ANTIGRAVITY. Analyze patent claim structure only. Never assess patentability. Output JSON only."
+
+_CLAIM_PROMPT = """Analyze this patent claim for structural elements and clarity.
+
+CLAIM TEXT: {claim_text}
+CLAIM TYPE: {claim_type}
+DOMAIN: {domain}
+
+Respond in valid JSON:
+{{
+    "claim_elements": ["element1", "element2"],
+    "scope_assessment": "broad/narrow/moderate assessment with reasoning",
+    "potential_issues": ["issue1", "issue2"],
+    "clarity_score": 0.0 to 1.0,
+    "specificity_score": 0.0 to 1.0
+}}
+
+RULES:
+- Do NOT assess patentability
+- Do NOT provide legal advice
+- Focus on structural analysis only
+- If uncertain, use 0.5 for scores
+"""
+
+_RISK_SYSTEM_PROMPT = "You are ANTIGRAVITY. Generate probabilistic risk scores. Never claim certainty. Output JSON only."
+
+_RISK_PROMPT = """Generate risk indicators for this patent claim.
+
+CLAIM: {claim_text}
+
+Respond in valid JSON:
+{{
+    "novelty_risk": 0.0 to 1.0 (higher = more likely to overlap with prior art),
+    "scope_risk": 0.0 to 1.0 (higher = scope may be too broad or too narrow),
+    "clarity_risk": 0.0 to 1.0 (higher = claim may be unclear),
+    "prior_art_risk": 0.0 to 1.0 (higher = estimated overlap with existing patents),
+    "overall_risk": 0.0 to 1.0 (weighted average)
+}}
+
+IMPORTANT:
+- These are ESTIMATES, not legal conclusions
+- Without actual prior art search, default prior_art_risk to 0.5
+- Bias toward uncertainty (0.5) when unsure
+"""
 
 
 class ClaimInput(BaseModel):
@@ -23,8 +93,15 @@ class ClaimInput(BaseModel):
     domain: Optional[str] = None
 
 
+# Pre-built adapter: validate_json parses and validates the request body
+# in a single pass instead of json.loads -> dict -> model_validate.
+_CLAIM_ADAPTER = TypeAdapter(ClaimInput)
+
+
 class ClaimAnalysisResult(BaseModel):
     """Claim analysis output."""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     claim_elements: List[str]
     scope_assessment: str
     potential_issues: List[str]
@@ -34,6 +111,8 @@ class ClaimAnalysisResult(BaseModel):
 
 class PatentRiskIndicators(BaseModel):
     """Patent risk scoring."""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     novelty_risk: float = Field(..., ge=0.0, le=1.0)
     scope_risk: float = Field(..., ge=0.0, le=1.0)
     clarity_risk: float = Field(..., ge=0.0, le=1.0)
@@ -41,168 +120,233 @@ class PatentRiskIndicators(BaseModel):
     overall_risk: float = Field(..., ge=0.0, le=1.0)
 
 
-@router.post("/analyze-claim")
-async def analyze_claim(claim: ClaimInput):
+async def _build_claim_analysis_payload(claim: ClaimInput, no_cache: bool = False) -> dict:
     """
-    Analyze a patent claim for structure and potential issues.
-    
-    This does NOT assess patentability.
-    This provides structural and clarity indicators only.
+    Run the claim-analysis pipeline and return a plain JSON payload.
+
+    Shared by the synchronous endpoint and the background job path.
     """
-    try:
-        prompt = f"""Analyze this patent claim for structural elements and clarity.
+    prompt = _CLAIM_PROMPT.format(
+        claim_text=claim.claim_text,
+        claim_type=claim.claim_type,
+        domain=claim.domain or "Not specified"
+    )
 
-CLAIM TEXT: {claim.claim_text}
-CLAIM TYPE: {claim.claim_type}
-DOMAIN: {claim.domain or 'Not specified'}
+    result = await cached_generate(SLMRequest(
+        prompt=prompt,
+        system_prompt=_CLAIM_SYSTEM_PROMPT,
+        response_format="json"
+    ), no_cache=no_cache)
 
-Respond in valid JSON:
-{{
-    "claim_elements": ["element1", "element2"],
-    "scope_assessment": "broad/narrow/moderate assessment with reasoning",
-    "potential_issues": ["issue1", "issue2"],
-    "clarity_score": 0.0 to 1.0,
-    "specificity_score": 0.0 to 1.0
-}}
+    if not result.success:
+        return CrashLog(
+            status="CRASH",
+            error_type="UNKNOWN_FAILURE",
+            error_message=f"Claim analysis failed: {result.error}",
+            failed_stage="reasoning",
+            evidence_state={"provided": True, "retrieved_count": 0, "usable": True},
+            confidence_score=0.0,
+            recommended_action="retry_with_more_evidence",
+            debug_trace=["Received claim", "Sent to SLM", "Failed"]
+        ).model_dump()
 
-RULES:
-- Do NOT assess patentability
-- Do NOT provide legal advice
-- Focus on structural analysis only
-- If uncertain, use 0.5 for scores
-"""
-        
-        result = await slm_engine.generate(SLMRequest(
-            prompt=prompt,
-            system_prompt="You are ANTIGRAVITY. Analyze patent claim structure only. Never assess patentability. Output JSON only.",
-            response_format="json"
-        ))
-        
-        if not result.success:
-            return CrashLog(
-                status="CRASH",
-                error_type="UNKNOWN_FAILURE",
-                error_message=f"Claim analysis failed: {result.error}",
-                failed_stage="reasoning",
-                evidence_state={"provided": True, "retrieved_count": 0, "usable": True},
-                confidence_score=0.0,
-                recommended_action="retry_with_more_evidence",
-                debug_trace=["Received claim", "Sent to SLM", "Failed"]
-            )
-        
-        parsed = result.parsed_json
-        evidence_id = f"EVD-CLAIM-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}"
-        
-        return {
-            "analysis": ClaimAnalysisResult(**parsed),
-            "evidence_references": [{
-                "evidence_id": evidence_id,
-                "source": "user_input",
-                "timestamp": datetime.utcnow().isoformat()
-            }],
-            "confidence": "medium",
-            "scope_disclaimer": "This analysis examines claim structure only. It does NOT determine patentability, validity, or enforceability. Consult a patent attorney for legal assessment."
-        }
-        
-    except Exception as e:
+    # SLM output is already JSON-shaped - apply defaults inline and
+    # serialize once with orjson instead of round-tripping through a
+    # Pydantic model.
+    parsed = result.parsed_json
+    evidence_id = f"EVD-CLAIM-{time.time_ns()}-{next(_evd_seq)}"
+
+    return {
+        "analysis": {
+            "claim_elements": parsed.get("claim_elements", []),
+            "scope_assessment": parsed.get("scope_assessment", ""),
+            "potential_issues": parsed.get("potential_issues", []),
+            "clarity_score": parsed.get("clarity_score", 0.5),
+            "specificity_score": parsed.get("specificity_score", 0.5)
+        },
+        "evidence_references": [{
+            "evidence_id": evidence_id,
+            "source": "user_input",
+            "timestamp": _utc_timestamp()
+        }],
+        "confidence": "medium",
+        "scope_disclaimer": "This analysis examines claim structure only. It does NOT determine patentability, validity, or enforceability. Consult a patent attorney for legal assessment."
+    }
+
+
+async def _build_risk_scan_payload(claim: ClaimInput, no_cache: bool = False) -> dict:
+    """
+    Run the risk-scan pipeline and return a plain JSON payload.
+
+    Shared by the synchronous endpoint and the background job path.
+    """
+    prompt = _RISK_PROMPT.format(claim_text=claim.claim_text)
+
+    result = await cached_generate(SLMRequest(
+        prompt=prompt,
+        system_prompt=_RISK_SYSTEM_PROMPT,
+        response_format="json"
+    ), no_cache=no_cache)
+
+    if not result.success:
         return CrashLog(
             status="CRASH",
             error_type="UNKNOWN_FAILURE",
-            error_message=str(e),
-            failed_stage="output_generation",
+            error_message=f"Risk scan failed: {result.error}",
+            failed_stage="reasoning",
             evidence_state={"provided": True, "retrieved_count": 0, "usable": True},
             confidence_score=0.0,
-            recommended_action="system_debug",
-            debug_trace=["Processing error", str(e)]
-        )
+            recommended_action="retry_with_more_evidence",
+            debug_trace=["Received claim", "Sent to SLM", "Failed"]
+        ).model_dump()
 
+    parsed = result.parsed_json
 
-@router.post("/risk-scan")
-async def scan_patent_risk(claim: ClaimInput):
+    return {
+        "risk_indicators": {
+            "novelty_risk": parsed.get("novelty_risk", 0.5),
+            "scope_risk": parsed.get("scope_risk", 0.5),
+            "clarity_risk": parsed.get("clarity_risk", 0.5),
+            "prior_art_risk": parsed.get("prior_art_risk", 0.5),
+            "overall_risk": parsed.get("overall_risk", 0.5)
+        },
+        "confidence": "low",
+        "scope_disclaimer": "Risk scores are probabilistic estimates based on textual analysis only. No actual prior art search was performed. These do NOT constitute legal advice or patentability assessment.",
+        "unknowns": [
+            "Actual prior art database not queried",
+            "Patent examiner interpretation unknown",
+            "Claim construction may vary"
+        ]
+    }
+
+
+@router.post("/analyze-claim", response_class=ORJSONResponse)
+async def analyze_claim(request: Request, no_cache: bool = False):
+    """
+    Analyze a patent claim for structure and potential issues.
+
+    This does NOT assess patentability.
+    This provides structural and clarity indicators only.
+    """
+    try:
+        claim = _CLAIM_ADAPTER.validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+    return ORJSONResponse(content=await _build_claim_analysis_payload(claim, no_cache))
+
+
+@router.post("/analyze-claim/async", status_code=202, response_class=ORJSONResponse)
+async def analyze_claim_async(request: Request, no_cache: bool = False):
+    """
+    Submit claim analysis as a background job.
+
+    Returns 202 with a job id immediately so workers are not held for
+    seconds of LLM latency; poll the status URL for the result.
+    """
+    try:
+        claim = _CLAIM_ADAPTER.validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+    job_id = job_store.submit(lambda: _build_claim_analysis_payload(claim, no_cache))
+    return ORJSONResponse(status_code=202, content={
+        "job_id": job_id,
+        "status": "pending",
+        "status_url": f"/api/patent/jobs/{job_id}"
+    })
+
+
+@router.post("/risk-scan", response_class=ORJSONResponse)
+async def scan_patent_risk(request: Request, no_cache: bool = False):
     """
     Generate risk indicators for a patent claim.
-    
+
     All scores are PROBABILISTIC ESTIMATES.
     This is NOT a patentability assessment.
     """
     try:
-        prompt = f"""Generate risk indicators for this patent claim.
+        claim = _CLAIM_ADAPTER.validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
 
-CLAIM: {claim.claim_text}
+    return ORJSONResponse(content=await _build_risk_scan_payload(claim, no_cache))
 
-Respond in valid JSON:
-{{
-    "novelty_risk": 0.0 to 1.0 (higher = more likely to overlap with prior art),
-    "scope_risk": 0.0 to 1.0 (higher = scope may be too broad or too narrow),
-    "clarity_risk": 0.0 to 1.0 (higher = claim may be unclear),
-    "prior_art_risk": 0.0 to 1.0 (higher = estimated overlap with existing patents),
-    "overall_risk": 0.0 to 1.0 (weighted average)
-}}
 
-IMPORTANT:
-- These are ESTIMATES, not legal conclusions
-- Without actual prior art search, default prior_art_risk to 0.5
-- Bias toward uncertainty (0.5) when unsure
-"""
-        
-        result = await slm_engine.generate(SLMRequest(
-            prompt=prompt,
-            system_prompt="You are ANTIGRAVITY. Generate probabilistic risk scores. Never claim certainty. Output JSON only.",
-            response_format="json"
-        ))
-        
-        if not result.success:
-            return CrashLog(
-                status="CRASH",
-                error_type="UNKNOWN_FAILURE",
-                error_message=f"Risk scan failed: {result.error}",
-                failed_stage="reasoning",
-                evidence_state={"provided": True, "retrieved_count": 0, "usable": True},
-                confidence_score=0.0,
-                recommended_action="retry_with_more_evidence",
-                debug_trace=["Received claim", "Sent to SLM", "Failed"]
-            )
-        
-        parsed = result.parsed_json
-        
-        return {
-            "risk_indicators": PatentRiskIndicators(**parsed),
-            "confidence": "low",
-            "scope_disclaimer": "Risk scores are probabilistic estimates based on textual analysis only. No actual prior art search was performed. These do NOT constitute legal advice or patentability assessment.",
-            "unknowns": [
-                "Actual prior art database not queried",
-                "Patent examiner interpretation unknown",
-                "Claim construction may vary"
-            ]
-        }
-        
-    except Exception as e:
-        return CrashLog(
-            status="CRASH",
-            error_type="UNKNOWN_FAILURE",
-            error_message=str(e),
-            failed_stage="output_generation",
-            evidence_state={"provided": True, "retrieved_count": 0, "usable": True},
-            confidence_score=0.0,
-            recommended_action="system_debug",
-            debug_trace=["Processing error", str(e)]
-        )
+@router.post("/risk-scan/async", status_code=202, response_class=ORJSONResponse)
+async def scan_patent_risk_async(request: Request, no_cache: bool = False):
+    """
+    Submit a risk scan as a background job.
+
+    Returns 202 with a job id immediately so workers are not held for
+    seconds of LLM latency; poll the status URL for the result.
+    """
+    try:
+        claim = _CLAIM_ADAPTER.validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+    job_id = job_store.submit(lambda: _build_risk_scan_payload(claim, no_cache))
+    return ORJSONResponse(status_code=202, content={
+        "job_id": job_id,
+        "status": "pending",
+        "status_url": f"/api/patent/jobs/{job_id}"
+    })
+
+
+@router.post("/full-scan", response_class=ORJSONResponse)
+async def full_patent_scan(request: Request, no_cache: bool = False):
+    """
+    Run claim analysis and risk scan concurrently for one claim.
+
+    Replaces the sequential analyze-claim-then-risk-scan frontend flow
+    with a single call whose wall time is the slower of the two.
+    """
+    try:
+        claim = _CLAIM_ADAPTER.validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+    analysis, risk = await asyncio.gather(
+        _build_claim_analysis_payload(claim, no_cache),
+        _build_risk_scan_payload(claim, no_cache),
+    )
+    return ORJSONResponse(content={"claim_analysis": analysis, "risk_scan": risk})
+
+
+@router.get("/jobs/{job_id}", response_class=ORJSONResponse)
+async def get_patent_job(job_id: str):
+    """Poll a background claim-analysis or risk-scan job."""
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+
+    payload = {"job_id": job.id, "status": job.status}
+    if job.status == "complete":
+        payload["result"] = job.result
+    elif job.status == "failed":
+        payload["error"] = job.error
+    return ORJSONResponse(content=payload)
+
+
+# Status payload is constant - serialize it once at import.
+_STATUS_JSON = orjson.dumps({
+    "service": "patent_intelligence",
+    "status": "operational",
+    "capabilities": [
+        "claim_analysis",
+        "risk_scanning",
+        "structure_assessment"
+    ],
+    "limitations": [
+        "No prior art database integration",
+        "No USPTO/EPO API connection",
+        "Probabilistic estimates only"
+    ]
+})
 
 
 @router.get("/status")
 async def patent_status():
     """Get patent intelligence service status."""
-    return {
-        "service": "patent_intelligence",
-        "status": "operational",
-        "capabilities": [
-            "claim_analysis",
-            "risk_scanning",
-            "structure_assessment"
-        ],
-        "limitations": [
-            "No prior art database integration",
-            "No USPTO/EPO API connection",
-            "Probabilistic estimates only"
-        ]
-    }
+    return Response(content=_STATUS_JSON, media_type="application/json")
@@ -5,7 +5,6 @@ Project CRUD and analysis endpoints.
 """
 
 from fastapi import APIRouter, HTTPException, Depends
-from typing import Optional
 
 from app.core.project_schemas import (
     Project, ProjectCreate, ProjectUpdate, ProjectList,
@@ -99,7 +98,7 @@ async def get_roadmap(
     current_user: User = Depends(get_current_user)
 ):
     """Get roadmap for a project."""
-    roadmap = project_service.get_roadmap(project_id, current_user.id)
+    roadmap = await project_service.get_roadmap(project_id, current_user.id)
     if not roadmap:
         raise HTTPException(status_code=404, detail="Project or roadmap not found")
     return roadmap
@@ -114,7 +113,7 @@ async def update_milestone(
     current_user: User = Depends(get_current_user)
 ):
     """Update a milestone's completion status."""
-    roadmap = project_service.update_milestone(
+    roadmap = await project_service.update_milestone(
         project_id, current_user.id, phase_id, milestone_id, completed
     )
     if not roadmap:
@@ -5,12 +5,16 @@ Research engine endpoints for literature search and synthesis.
 Uses Gemini for AI-powered research analysis.
 """
 
-from fastapi import APIRouter
-from pydantic import BaseModel, Field
+import orjson
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError
 from typing import List, Optional
-from datetime import datetime
 
-from app.services.slm_engine import slm_engine, SLMRequest
+from app.services.slm_engine import slm_engine, strip_code_fences, SLMRequest
+from app.services.slm_cache import cached_generate
+from app.services.job_store import job_store
 from app.core.schemas import CrashLog
 
 router = APIRouter()
@@ -23,8 +27,29 @@ class ResearchQuery(BaseModel):
     research_type: str = Field("general", description="Type: general, literature_review, gap_analysis, trend_analysis")
 
 
+# Pre-built adapter: validate_json parses and validates the request body
+# in a single pass instead of json.loads -> dict -> model_validate.
+_QUERY_ADAPTER = TypeAdapter(ResearchQuery)
+
+# The static schema and rules live in the system prompt so the large
+# constant prefix is sent once per request and is eligible for
+# provider-side prompt caching; the per-request prompt carries only the
+# variable fields.
+_RESEARCH_SYSTEM_PROMPT = """You are ANTIGRAVITY, an evidence-locked research intelligence system.
+Provide specific, actionable research guidance. Acknowledge limitations and unknowns; make no claims without basis.
+
+Respond with ONLY valid JSON (no markdown) matching this schema:
+{"query_summary": "2-3 sentence summary", "key_concepts": ["5 concepts"], "related_topics": [{"topic": "Name", "relevance": "HIGH|MEDIUM|LOW", "description": "brief"}], "research_gaps": [{"gap": "identified gap", "opportunity": "what could be explored", "difficulty": "HIGH|MEDIUM|LOW"}], "suggested_directions": [{"direction": "direction", "rationale": "why promising", "potential_impact": "HIGH|MEDIUM|LOW"}], "methodology_suggestions": ["3 approaches"], "potential_challenges": ["2 challenges"]}"""
+
+_RESEARCH_PROMPT = """RESEARCH QUERY: {query}
+DOMAIN: {domain}
+ANALYSIS TYPE: {research_type}"""
+
+
 class RelatedTopic(BaseModel):
     """Related research topic."""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     topic: str
     relevance: str
     description: str
@@ -32,6 +57,8 @@ class RelatedTopic(BaseModel):
 
 class ResearchGap(BaseModel):
     """Identified research gap."""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     gap: str
     opportunity: str
     difficulty: str
@@ -39,6 +66,8 @@ class ResearchGap(BaseModel):
 
 class ResearchDirection(BaseModel):
     """Suggested research direction."""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     direction: str
     rationale: str
     potential_impact: str
@@ -49,7 +78,7 @@ class ResearchAnalysisResponse(BaseModel):
     query_summary: str
     key_concepts: List[str]
     related_topics: List[RelatedTopic]
-    research_gaps: List[ResearchGap]  
+    research_gaps: List[ResearchGap]
     suggested_directions: List[ResearchDirection]
     methodology_suggestions: List[str]
     potential_challenges: List[str]
@@ -58,11 +87,93 @@ class ResearchAnalysisResponse(BaseModel):
     unknowns: List[str]
 
 
-@router.post("/analyze", response_model=ResearchAnalysisResponse | CrashLog)
-async def analyze_research(query: ResearchQuery):
+async def _build_analysis_payload(query: ResearchQuery, no_cache: bool = False) -> dict:
+    """
+    Run the research-analysis pipeline and return a plain JSON payload.
+
+    Shared by the synchronous endpoint and the background job path.
+    """
+    analysis_prompt = _RESEARCH_PROMPT.format(
+        query=query.query,
+        domain=query.domain or "General",
+        research_type=query.research_type
+    )
+
+    # Call SLM (cached by prompt hash - repeat queries skip the LLM)
+    slm_response = await cached_generate(SLMRequest(
+        prompt=analysis_prompt,
+        system_prompt=_RESEARCH_SYSTEM_PROMPT,
+        response_format="json"
+    ), no_cache=no_cache)
+
+    if not slm_response.success:
+        return CrashLog(
+            status="CRASH",
+            error_type="UNKNOWN_FAILURE",
+            error_message=f"SLM generation failed: {slm_response.error}",
+            failed_stage="reasoning",
+            recommended_action="retry_with_more_evidence"
+        ).model_dump()
+
+    # Parse and validate response
+    parsed = slm_response.parsed_json
+    if not parsed:
+        return CrashLog(
+            status="CRASH",
+            error_type="PARSE_ERROR",
+            error_message="Failed to parse SLM response as JSON",
+            failed_stage="parsing",
+            recommended_action="retry"
+        ).model_dump()
+
+    # Build response as plain dicts and serialize once with orjson -
+    # the SLM output is already JSON-shaped, so re-validating it
+    # through Pydantic models just to re-serialize burns CPU on the
+    # hot path. Defaults are applied inline with .get().
+    return {
+        "query_summary": parsed.get("query_summary", "Analysis completed"),
+        "key_concepts": parsed.get("key_concepts", [])[:8],
+        "related_topics": [
+            {
+                "topic": t.get("topic", ""),
+                "relevance": t.get("relevance", "MEDIUM"),
+                "description": t.get("description", "")
+            }
+            for t in parsed.get("related_topics", [])[:5]
+        ],
+        "research_gaps": [
+            {
+                "gap": g.get("gap", ""),
+                "opportunity": g.get("opportunity", ""),
+                "difficulty": g.get("difficulty", "MEDIUM")
+            }
+            for g in parsed.get("research_gaps", [])[:4]
+        ],
+        "suggested_directions": [
+            {
+                "direction": d.get("direction", ""),
+                "rationale": d.get("rationale", ""),
+                "potential_impact": d.get("potential_impact", "MEDIUM")
+            }
+            for d in parsed.get("suggested_directions", [])[:4]
+        ],
+        "methodology_suggestions": parsed.get("methodology_suggestions", [])[:5],
+        "potential_challenges": parsed.get("potential_challenges", [])[:4],
+        "confidence": "medium",
+        "scope_disclaimer": "This analysis is AI-generated and provides research guidance only. It does not replace thorough literature review or expert consultation. All suggestions should be verified through actual academic sources.",
+        "unknowns": [
+            "Specific paper citations not available without database integration",
+            "Real-time publication data not included",
+            "Citation counts and impact factors not available"
+        ]
+    }
+
+
+@router.post("/analyze", response_class=ORJSONResponse)
+async def analyze_research(request: Request, no_cache: bool = False):
     """
     Analyze a research topic using AI.
-    
+
     This endpoint:
     - Analyzes the research query
     - Identifies related topics and concepts
@@ -70,149 +181,117 @@ async def analyze_research(query: ResearchQuery):
     - Provides methodology suggestions
     """
     try:
-        # Validate input
-        if not query.query or len(query.query.strip()) < 10:
-            return CrashLog(
-                status="CRASH",
-                error_type="INSUFFICIENT_INPUT",
-                error_message="Research query must be at least 10 characters",
-                failed_stage="validation",
-                recommended_action="provide_more_detail"
-            )
-
-        # Build the analysis prompt
-        system_prompt = """You are ANTIGRAVITY, an evidence-locked research intelligence system.
-Your task is to analyze research topics and provide structured insights.
-
-RULES:
-- Be specific and actionable in suggestions
-- Acknowledge limitations and unknowns
-- Do not make claims without basis
-- Focus on practical research guidance
-- Output valid JSON only"""
-
-        analysis_prompt = f"""Analyze this research topic and provide structured research guidance.
-
-RESEARCH QUERY: {query.query}
-DOMAIN: {query.domain or 'General'}
-ANALYSIS TYPE: {query.research_type}
-
-Provide a JSON response with this EXACT structure:
-{{
-    "query_summary": "2-3 sentence summary of the research topic",
-    "key_concepts": ["concept1", "concept2", "concept3", "concept4", "concept5"],
-    "related_topics": [
-        {{"topic": "Topic Name", "relevance": "HIGH|MEDIUM|LOW", "description": "Brief description"}},
-        {{"topic": "Topic Name 2", "relevance": "HIGH|MEDIUM|LOW", "description": "Brief description"}}
-    ],
-    "research_gaps": [
-        {{"gap": "Identified gap in research", "opportunity": "What could be explored", "difficulty": "HIGH|MEDIUM|LOW"}},
-        {{"gap": "Another gap", "opportunity": "What could be explored", "difficulty": "HIGH|MEDIUM|LOW"}}
-    ],
-    "suggested_directions": [
-        {{"direction": "Research direction", "rationale": "Why this is promising", "potential_impact": "HIGH|MEDIUM|LOW"}},
-        {{"direction": "Another direction", "rationale": "Why this is promising", "potential_impact": "HIGH|MEDIUM|LOW"}}
-    ],
-    "methodology_suggestions": [
-        "Suggested methodology or approach 1",
-        "Suggested methodology or approach 2",
-        "Suggested methodology or approach 3"
-    ],
-    "potential_challenges": [
-        "Challenge or limitation 1",
-        "Challenge or limitation 2"
-    ]
-}}
-
-Respond with ONLY valid JSON, no markdown."""
-
-        # Call SLM
-        slm_response = await slm_engine.generate(SLMRequest(
-            prompt=analysis_prompt,
-            system_prompt=system_prompt,
-            response_format="json"
-        ))
-
-        if not slm_response.success:
-            return CrashLog(
-                status="CRASH",
-                error_type="UNKNOWN_FAILURE",
-                error_message=f"SLM generation failed: {slm_response.error}",
-                failed_stage="reasoning",
-                recommended_action="retry_with_more_evidence"
-            )
-
-        # Parse and validate response
-        parsed = slm_response.parsed_json
-        if not parsed:
-            return CrashLog(
-                status="CRASH",
-                error_type="PARSE_ERROR",
-                error_message="Failed to parse SLM response as JSON",
-                failed_stage="parsing",
-                recommended_action="retry"
-            )
-
-        # Build response
-        return ResearchAnalysisResponse(
-            query_summary=parsed.get("query_summary", "Analysis completed"),
-            key_concepts=parsed.get("key_concepts", [])[:8],
-            related_topics=[
-                RelatedTopic(
-                    topic=t.get("topic", ""),
-                    relevance=t.get("relevance", "MEDIUM"),
-                    description=t.get("description", "")
-                )
-                for t in parsed.get("related_topics", [])[:5]
-            ],
-            research_gaps=[
-                ResearchGap(
-                    gap=g.get("gap", ""),
-                    opportunity=g.get("opportunity", ""),
-                    difficulty=g.get("difficulty", "MEDIUM")
-                )
-                for g in parsed.get("research_gaps", [])[:4]
-            ],
-            suggested_directions=[
-                ResearchDirection(
-                    direction=d.get("direction", ""),
-                    rationale=d.get("rationale", ""),
-                    potential_impact=d.get("potential_impact", "MEDIUM")
-                )
-                for d in parsed.get("suggested_directions", [])[:4]
-            ],
-            methodology_suggestions=parsed.get("methodology_suggestions", [])[:5],
-            potential_challenges=parsed.get("potential_challenges", [])[:4],
-            confidence="medium",
-            scope_disclaimer="This analysis is AI-generated and provides research guidance only. It does not replace thorough literature review or expert consultation. All suggestions should be verified through actual academic sources.",
-            unknowns=[
-                "Specific paper citations not available without database integration",
-                "Real-time publication data not included",
-                "Citation counts and impact factors not available"
-            ]
-        )
+        query = _QUERY_ADAPTER.validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+    return ORJSONResponse(content=await _build_analysis_payload(query, no_cache))
+
 
+@router.post("/analyze/async", status_code=202, response_class=ORJSONResponse)
+async def analyze_research_async(request: Request, no_cache: bool = False):
+    """
+    Submit research analysis as a background job.
+
+    Returns 202 with a job id immediately so workers are not held for
+    seconds of LLM latency; poll the status URL for the result.
+    """
+    try:
+        query = _QUERY_ADAPTER.validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+    job_id = job_store.submit(lambda: _build_analysis_payload(query, no_cache))
+    return ORJSONResponse(status_code=202, content={
+        "job_id": job_id,
+        "status": "pending",
+        "status_url": f"/api/research/jobs/{job_id}"
+    })
+
+
+async def _stream_analysis_frames(query: ResearchQuery):
+    """
+    Yield newline-delimited JSON frames as the SLM streams tokens.
+
+    Text deltas arrive as {"delta": ...}; once generation finishes the
+    assembled output is parsed and emitted as a final {"event":
+    "complete", "result": ...} frame (or an error frame).
+    """
+    request = SLMRequest(
+        prompt=_RESEARCH_PROMPT.format(
+            query=query.query,
+            domain=query.domain or "General",
+            research_type=query.research_type
+        ),
+        system_prompt=_RESEARCH_SYSTEM_PROMPT,
+        response_format="json"
+    )
+
+    parts = []
+    try:
+        async for chunk in slm_engine.generate_stream(request):
+            parts.append(chunk)
+            yield orjson.dumps({"delta": chunk}) + b"\n"
     except Exception as e:
-        return CrashLog(
-            status="CRASH",
-            error_type="UNKNOWN_FAILURE",
-            error_message=str(e),
-            failed_stage="processing",
-            recommended_action="system_debug"
-        )
+        yield orjson.dumps({"event": "error", "error": str(e)}) + b"\n"
+        return
+
+    raw = strip_code_fences("".join(parts).strip())
+    try:
+        yield orjson.dumps({"event": "complete", "result": orjson.loads(raw)}) + b"\n"
+    except orjson.JSONDecodeError as e:
+        yield orjson.dumps({"event": "error", "error": f"JSON parsing failed: {e}"}) + b"\n"
+
+
+@router.post("/analyze/stream")
+async def analyze_research_stream(request: Request):
+    """
+    Stream research analysis as newline-delimited JSON.
+
+    First bytes reach the client as soon as the model emits tokens
+    instead of after the full generation completes.
+    """
+    try:
+        query = _QUERY_ADAPTER.validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+    return StreamingResponse(
+        _stream_analysis_frames(query),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.get("/jobs/{job_id}", response_class=ORJSONResponse)
+async def get_research_job(job_id: str):
+    """Poll a background research-analysis job."""
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+
+    payload = {"job_id": job.id, "status": job.status}
+    if job.status == "complete":
+        payload["result"] = job.result
+    elif job.status == "failed":
+        payload["error"] = job.error
+    return ORJSONResponse(content=payload)
+
+
+# Status payload is constant - serialize it once at import.
+_STATUS_JSON = orjson.dumps({
+    "service": "research",
+    "status": "active",
+    "capabilities": [
+        "topic_analysis",
+        "gap_detection",
+        "direction_suggestions",
+        "methodology_guidance"
+    ],
+    "model": "gemini-flash-latest"
+})
 
 
 @router.get("/status")
 async def research_status():
     """Get research service status."""
-    return {
-        "service": "research",
-        "status": "active",
-        "capabilities": [
-            "topic_analysis",
-            "gap_detection",
-            "direction_suggestions",
-            "methodology_guidance"
-        ],
-        "model": "gemini-flash-latest"
-    }
+    return Response(content=_STATUS_JSON, media_type="application/json")
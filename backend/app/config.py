@@ -30,6 +30,9 @@ class Settings(BaseSettings):
     # Gemini API
     gemini_api_key: str
     gemini_model: str = "gemini-1.5-flash"
+    slm_max_parallel: int = 4  # Concurrent in-flight SLM requests
+    slm_requests_per_minute: int = 60  # Token-bucket issue rate for Gemini calls
+    slm_cache_l2_ttl_days: int = 7  # Persistent SLM cache tier retention
     
     # Server
     backend_host: str = "0.0.0.0"
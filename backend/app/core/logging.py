@@ -0,0 +1,46 @@
+"""
+Inventix AI - Logging Setup
+===========================
+Non-blocking logging configuration for async request paths.
+"""
+
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+logger = logging.getLogger("inventix")
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging(level: int = logging.INFO):
+    """
+    Route application logging through a queue.
+
+    Handlers run on the listener thread, so emitting a record from a
+    coroutine is a lock-free queue put instead of a blocking stdio
+    write. Safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(
+        "%(asctime)s %(levelname)s %(name)s: %(message)s"
+    ))
+    _listener = QueueListener(log_queue, stream_handler)
+    _listener.start()
+
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(level)
+
+
+def shutdown_logging():
+    """Flush and stop the queue listener (called on app shutdown)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
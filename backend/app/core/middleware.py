@@ -0,0 +1,94 @@
+"""
+Inventix AI - ASGI Middleware
+=============================
+Request-level guards applied before routing.
+"""
+
+import orjson
+from fastapi.middleware.cors import CORSMiddleware
+
+
+class SetLookupCORSMiddleware(CORSMiddleware):
+    """
+    CORSMiddleware with O(1) origin membership checks.
+
+    Starlette scans its allow-list on every cross-origin request and
+    preflight; keeping the origins in a frozenset makes the check a
+    hash lookup instead.
+    """
+
+    def __init__(self, app, **kwargs):
+        super().__init__(app, **kwargs)
+        self._origin_set = frozenset(self.allow_origins)
+
+    def is_allowed_origin(self, origin: str) -> bool:
+        if self.allow_all_origins:
+            return True
+        if self.allow_origin_regex is not None and self.allow_origin_regex.fullmatch(origin):
+            return True
+        return origin in self._origin_set
+
+
+class ContentSizeLimitMiddleware:
+    """
+    Reject request bodies over a byte limit at the ASGI layer.
+
+    Requests declaring an oversize Content-Length are refused with 413
+    before any body bytes are consumed; bodies with a missing or lying
+    header are cut off as soon as the cumulative received bytes cross
+    the limit, so no handler ever buffers an oversize upload.
+    """
+
+    def __init__(self, app, max_content_size: int):
+        self.app = app
+        self.max_content_size = max_content_size
+        self._payload_413 = orjson.dumps({
+            "detail": f"Request body exceeds {max_content_size} byte limit"
+        })
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    break
+                if declared > self.max_content_size:
+                    await self._send_413(send)
+                    return
+                break
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_content_size:
+                    raise ContentSizeExceeded()
+            return message
+
+        try:
+            await self.app(scope, limited_receive, send)
+        except ContentSizeExceeded:
+            await self._send_413(send)
+
+    async def _send_413(self, send):
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json")],
+        })
+        await send({
+            "type": "http.response.body",
+            "body": self._payload_413,
+        })
+
+
+class ContentSizeExceeded(Exception):
+    """Raised by the wrapped receive when the body limit is crossed."""
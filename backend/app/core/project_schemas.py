@@ -4,7 +4,7 @@ Inventix AI - Project Schemas
 Pydantic models for Projects, Roadmaps, and Pipeline Status.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, Literal
 from datetime import datetime
 from enum import Enum
@@ -55,8 +55,7 @@ class User(UserBase):
     google_id: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserInDB(User):
@@ -111,6 +110,8 @@ class Recommendation(BaseModel):
 
 class ProjectAnalysis(BaseModel):
     """Project analysis results."""
+    model_config = ConfigDict(use_enum_values=True)
+
     novelty_score: float = Field(0.5, ge=0.0, le=1.0)
     novelty_status: NoveltyStatus = NoveltyStatus.UNKNOWN
     confidence_score: Optional[int] = None
@@ -138,12 +139,13 @@ class Project(ProjectBase):
     pipeline_stage: PipelineStage = PipelineStage.IDLE
     progress: float = Field(0.0, ge=0.0, le=100.0)
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
 
 
 class ProjectCard(BaseModel):
     """Project card for dashboard display."""
+    model_config = ConfigDict(use_enum_values=True)
+
     id: str
     title: str
     project_type: ProjectType
@@ -215,6 +217,8 @@ class PipelineNode(BaseModel):
 
 class PipelineStatus(BaseModel):
     """Real-time pipeline status."""
+    model_config = ConfigDict(use_enum_values=True)
+
     project_id: str
     current_stage: PipelineStage
     overall_progress: float = 0.0
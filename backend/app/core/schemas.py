@@ -5,7 +5,7 @@ ANTIGRAVITY-compliant response schemas.
 All outputs must conform to these structures.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Literal
 from enum import Enum
 from datetime import datetime
@@ -55,6 +55,8 @@ class EvidenceState(BaseModel):
 
 class EvidenceReference(BaseModel):
     """Reference to a piece of evidence."""
+    model_config = ConfigDict(frozen=True)
+
     evidence_id: str
     source: str
     content_hash: Optional[str] = None
@@ -68,6 +70,8 @@ class CrashLog(BaseModel):
     Emitted when the system cannot proceed safely.
     Crash logs are FIRST-CLASS OUTPUTS, not errors.
     """
+    model_config = ConfigDict(use_enum_values=True)
+
     status: Literal["CRASH"] = "CRASH"
     error_type: ErrorType
     error_message: str
@@ -97,8 +101,7 @@ class AntigravityResponse(BaseModel):
     inferred_risk: str
     unknowns: List[str]
     
-    class Config:
-        use_enum_values = True
+    model_config = ConfigDict(use_enum_values=True)
 
 
 class AnalysisRequest(BaseModel):
@@ -118,6 +121,8 @@ class AnalysisResult(AntigravityResponse):
 # Audit log schema
 class AuditEntry(BaseModel):
     """Immutable audit log entry."""
+    model_config = ConfigDict(use_enum_values=True)
+
     entry_id: str
     timestamp: datetime
     action: str
@@ -0,0 +1,28 @@
+"""
+Inventix AI - Text Scanning Helpers
+===================================
+Shared tokenization primitives for the document and refinement paths.
+"""
+
+import re
+
+# Whitespace-separated word, compiled once and shared by every caller
+_WORD_COUNT_RE = re.compile(r'\S+')
+
+# Word characters for token-set membership checks
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def count_words(text: str) -> int:
+    """Count whitespace-separated words without building a list."""
+    return sum(1 for _ in _WORD_COUNT_RE.finditer(text))
+
+
+def word_set_lower(text: str) -> frozenset:
+    """
+    Lowercased token set of `text` for membership checks.
+
+    One C-level scan; callers should hold the result for the duration
+    of a request rather than re-tokenizing per lookup.
+    """
+    return frozenset(_TOKEN_RE.findall(text.lower()))
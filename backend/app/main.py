@@ -4,23 +4,47 @@ Inventix AI - Main Application Entry Point
 Evidence-Locked Research & Patent Intelligence Platform
 """
 
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+try:
+    # Swap in uvloop before any event loop is created so launches that
+    # bypass the uvicorn flags below (e.g. python -m) still get it.
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
+import orjson
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 
 from app.config import settings
 from app.api import router as api_router
+from app.core.middleware import (
+    ContentSizeExceeded,
+    ContentSizeLimitMiddleware,
+    SetLookupCORSMiddleware,
+)
+from app.core.logging import logger, setup_logging, shutdown_logging
+from app.core.schemas import CrashLog
+from app.services.batch_scheduler import batch_scheduler
+from app.services.auth_service import close_http_client, preload_users
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     # Startup
-    print(f"🚀 Starting {settings.app_name} v{settings.app_version}")
-    print(f"📡 Gemini Model: {settings.gemini_model}")
+    setup_logging()
+    logger.info("Starting %s v%s", settings.app_name, settings.app_version)
+    logger.info("Gemini model: %s", settings.gemini_model)
+    await batch_scheduler.start()
+    preload_users()
     yield
     # Shutdown
-    print(f"👋 Shutting down {settings.app_name}")
+    await batch_scheduler.stop()
+    await close_http_client()
+    logger.info("Shutting down %s", settings.app_name)
+    shutdown_logging()
 
 
 app = FastAPI(
@@ -30,43 +54,89 @@ app = FastAPI(
     lifespan=lifespan,
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
 )
 
 # CORS Middleware
 app.add_middleware(
-    CORSMiddleware,
+    SetLookupCORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Reject oversize bodies before any handler buffers them
+app.add_middleware(ContentSizeLimitMiddleware, max_content_size=10 * 1024 * 1024)
+
 # Include API routes
 app.include_router(api_router, prefix="/api")
 
 
+@app.exception_handler(ContentSizeExceeded)
+async def content_size_handler(request: Request, exc: ContentSizeExceeded):
+    """Turn a mid-body limit breach into a 413 instead of a crash log."""
+    return ORJSONResponse(
+        status_code=413,
+        content={"detail": "Request body exceeds 10MB limit"}
+    )
+
+
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    """Emit the generic ANTIGRAVITY crash log for unexpected failures."""
+    crash = CrashLog(
+        status="CRASH",
+        error_type="UNKNOWN_FAILURE",
+        error_message=str(exc),
+        failed_stage="output_generation",
+        evidence_state={"provided": True, "retrieved_count": 0, "usable": True},
+        confidence_score=0.0,
+        recommended_action="system_debug",
+        debug_trace=[type(exc).__name__, str(exc)]
+    )
+    return ORJSONResponse(status_code=500, content=crash.model_dump())
+
+
+# Root and health payloads are constant per process - serialize them
+# once at import and let short-lived caches upstream absorb the rest.
+_ROOT_JSON = orjson.dumps({
+    "name": settings.app_name,
+    "version": settings.app_version,
+    "status": "operational",
+    "system": "ANTIGRAVITY",
+    "mode": "evidence-locked"
+})
+
+_HEALTH_JSON = orjson.dumps({
+    "status": "healthy",
+    "services": {
+        "api": "up",
+        "gemini": "configured"
+    }
+})
+
+_CACHE_HEADERS = {"Cache-Control": "public, max-age=30"}
+
+
 @app.get("/")
 async def root():
     """Root endpoint - health check."""
-    return {
-        "name": settings.app_name,
-        "version": settings.app_version,
-        "status": "operational",
-        "system": "ANTIGRAVITY",
-        "mode": "evidence-locked"
-    }
+    return Response(
+        content=_ROOT_JSON,
+        media_type="application/json",
+        headers=_CACHE_HEADERS
+    )
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {
-        "status": "healthy",
-        "services": {
-            "api": "up",
-            "gemini": "configured"
-        }
-    }
+    return Response(
+        content=_HEALTH_JSON,
+        media_type="application/json",
+        headers=_CACHE_HEADERS
+    )
 
 
 if __name__ == "__main__":
@@ -75,5 +145,7 @@ if __name__ == "__main__":
         "app.main:app",
         host=settings.backend_host,
         port=settings.backend_port,
-        reload=settings.debug
+        reload=settings.debug,
+        loop="uvloop",
+        http="httptools"
     )
@@ -5,46 +5,131 @@ Google OAuth and JWT token management.
 """
 
 import httpx
+import orjson
+import sqlite3
+import threading
+import time
+from cachetools import TTLCache
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
+from urllib.parse import urlencode
 from jose import JWTError, jwt
-from fastapi import HTTPException, Security, Depends
+from fastapi import HTTPException, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import uuid
-import json
 from pathlib import Path
 
 from app.config import settings
-from app.core.project_schemas import User, UserCreate, TokenData, GoogleUserInfo
+from app.core.project_schemas import User, TokenData, GoogleUserInfo
 
 # Security scheme
 security = HTTPBearer(auto_error=False)
 
-# Simple file-based user storage for MVP
+# Shared HTTP client - pooled keep-alive connections amortize TCP+TLS
+# setup across Google OAuth calls. Created lazily on first use.
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared pooled AsyncClient, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+            timeout=10.0
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared HTTP client (called on app shutdown)."""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+
+# SQLite-backed user storage. Lookups by id and google_id are indexed
+# B-tree probes instead of the former full-file JSON parse plus linear
+# scan, and creating a user inserts one row instead of rewriting the
+# whole store.
 DATA_DIR = Path(__file__).parent.parent.parent / "data"
-USERS_FILE = DATA_DIR / "users.json"
+USERS_FILE = DATA_DIR / "users.json"  # legacy store, migrated on first connect
 
+_db: Optional[sqlite3.Connection] = None
+_db_lock = threading.Lock()
 
-def _ensure_data_dir():
-    """Ensure data directory exists."""
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    if not USERS_FILE.exists():
-        USERS_FILE.write_text("{}")
 
+def _db_path() -> str:
+    """Resolve the SQLite file path from the configured database URL."""
+    url = settings.database_url
+    if url.startswith("sqlite:///"):
+        return url[len("sqlite:///"):]
+    return str(DATA_DIR / "inventix.db")
 
-def _load_users() -> dict:
-    """Load users from file."""
-    _ensure_data_dir()
+
+def _migrate_legacy_users(conn: sqlite3.Connection):
+    """Import users from the old users.json store, if present."""
+    if not USERS_FILE.exists():
+        return
     try:
-        return json.loads(USERS_FILE.read_text())
+        legacy = orjson.loads(USERS_FILE.read_bytes())
     except Exception:
-        return {}
+        return
+    for user_id, data in legacy.items():
+        conn.execute(
+            "INSERT OR IGNORE INTO users (id, google_id, email, name, picture, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                user_id,
+                data.get("google_id"),
+                data.get("email"),
+                data.get("name"),
+                data.get("picture"),
+                str(data.get("created_at", ""))
+            )
+        )
+    conn.commit()
+
 
+def _get_db() -> sqlite3.Connection:
+    """Return the shared connection, creating schema on first use."""
+    global _db
+    with _db_lock:
+        if _db is None:
+            DATA_DIR.mkdir(parents=True, exist_ok=True)
+            _db = sqlite3.connect(_db_path(), check_same_thread=False)
+            _db.row_factory = sqlite3.Row
+            _db.execute("""
+                CREATE TABLE IF NOT EXISTS users (
+                    id TEXT PRIMARY KEY,
+                    google_id TEXT UNIQUE,
+                    email TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    picture TEXT,
+                    created_at TEXT NOT NULL
+                )
+            """)
+            _db.commit()
+            _migrate_legacy_users(_db)
+        return _db
 
-def _save_users(users: dict):
-    """Save users to file."""
-    _ensure_data_dir()
-    USERS_FILE.write_text(json.dumps(users, indent=2, default=str))
+
+def _row_to_user(row: sqlite3.Row) -> User:
+    """Build a User model from a users table row."""
+    return User(
+        id=row["id"],
+        google_id=row["google_id"],
+        email=row["email"],
+        name=row["name"],
+        picture=row["picture"],
+        created_at=datetime.fromisoformat(row["created_at"])
+    )
+
+
+def preload_users():
+    """Open the user database and run migrations; called at startup."""
+    _get_db()
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -64,103 +149,140 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def verify_token(token: str) -> Optional[TokenData]:
-    """Verify and decode a JWT token."""
+@lru_cache(maxsize=4096)
+def _decode_token(token: str) -> Optional[tuple]:
+    """
+    Decode and verify a JWT, memoized per token string.
+
+    Repeat requests from the same client skip the signature check and
+    base64 decode. Returns (TokenData, exp) so the caller can re-check
+    expiry on cache hits; invalid tokens cache as None.
+    """
     try:
         payload = jwt.decode(
-            token, 
-            settings.secret_key, 
+            token,
+            settings.secret_key,
             algorithms=[settings.jwt_algorithm]
         )
-        user_id: str = payload.get("sub")
-        email: str = payload.get("email")
-        if user_id is None:
-            return None
-        return TokenData(user_id=user_id, email=email)
     except JWTError:
         return None
+    user_id: str = payload.get("sub")
+    if user_id is None:
+        return None
+    return TokenData(user_id=user_id, email=payload.get("email")), payload.get("exp", 0)
+
+
+def verify_token(token: str) -> Optional[TokenData]:
+    """Verify and decode a JWT token."""
+    entry = _decode_token(token)
+    if entry is None:
+        return None
+    token_data, exp = entry
+    # The cached entry outlives the token - expiry is enforced here.
+    if exp <= time.time():
+        return None
+    return token_data
 
 
 async def get_google_user_info(access_token: str) -> GoogleUserInfo:
     """Fetch user info from Google using access token."""
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            "https://www.googleapis.com/oauth2/v2/userinfo",
-            headers={"Authorization": f"Bearer {access_token}"}
-        )
-        
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=401,
-                detail="Failed to get user info from Google"
-            )
-        
-        data = response.json()
-        return GoogleUserInfo(
-            id=data["id"],
-            email=data["email"],
-            name=data.get("name", data["email"].split("@")[0]),
-            picture=data.get("picture"),
-            verified_email=data.get("verified_email", True)
+    response = await get_http_client().get(
+        "https://www.googleapis.com/oauth2/v2/userinfo",
+        headers={"Authorization": f"Bearer {access_token}"}
+    )
+
+    if response.status_code != 200:
+        raise HTTPException(
+            status_code=401,
+            detail="Failed to get user info from Google"
         )
 
+    data = response.json()
+    return GoogleUserInfo(
+        id=data["id"],
+        email=data["email"],
+        name=data.get("name", data["email"].split("@")[0]),
+        picture=data.get("picture"),
+        verified_email=data.get("verified_email", True)
+    )
+
 
 async def exchange_code_for_token(code: str, redirect_uri: str) -> str:
     """Exchange authorization code for access token."""
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            "https://oauth2.googleapis.com/token",
-            data={
-                "code": code,
-                "client_id": settings.google_client_id,
-                "client_secret": settings.google_client_secret,
-                "redirect_uri": redirect_uri,
-                "grant_type": "authorization_code"
-            }
+    response = await get_http_client().post(
+        "https://oauth2.googleapis.com/token",
+        data={
+            "code": code,
+            "client_id": settings.google_client_id,
+            "client_secret": settings.google_client_secret,
+            "redirect_uri": redirect_uri,
+            "grant_type": "authorization_code"
+        }
+    )
+
+    if response.status_code != 200:
+        error_detail = response.json().get("error_description", "Token exchange failed")
+        raise HTTPException(
+            status_code=401,
+            detail=f"Failed to exchange code: {error_detail}"
         )
-        
-        if response.status_code != 200:
-            error_detail = response.json().get("error_description", "Token exchange failed")
-            raise HTTPException(
-                status_code=401,
-                detail=f"Failed to exchange code: {error_detail}"
-            )
-        
-        return response.json()["access_token"]
+
+    return response.json()["access_token"]
 
 
 def get_or_create_user(google_info: GoogleUserInfo) -> User:
     """Get existing user or create new one."""
-    users = _load_users()
-    
-    # Check if user exists by google_id
-    for user_id, user_data in users.items():
-        if user_data.get("google_id") == google_info.id:
-            return User(**user_data)
-    
+    db = _get_db()
+    row = db.execute(
+        "SELECT * FROM users WHERE google_id = ?", (google_info.id,)
+    ).fetchone()
+    if row is not None:
+        return _row_to_user(row)
+
     # Create new user
-    user_id = str(uuid.uuid4())
     user = User(
-        id=user_id,
+        id=str(uuid.uuid4()),
         google_id=google_info.id,
         email=google_info.email,
         name=google_info.name,
         picture=google_info.picture,
         created_at=datetime.utcnow()
     )
-    
-    users[user_id] = user.model_dump()
-    _save_users(users)
-    
+    with _db_lock:
+        db.execute(
+            "INSERT INTO users (id, google_id, email, name, picture, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                user.id,
+                user.google_id,
+                user.email,
+                user.name,
+                user.picture,
+                user.created_at.isoformat()
+            )
+        )
+        db.commit()
     return user
 
 
+# Short-lived User model cache: skips re-validating the same user
+# record on every authenticated request while staying fresh enough to
+# pick up profile changes within a minute.
+_user_model_cache: TTLCache = TTLCache(maxsize=1024, ttl=60)
+
+
 def get_user_by_id(user_id: str) -> Optional[User]:
     """Get user by ID."""
-    users = _load_users()
-    user_data = users.get(user_id)
-    if user_data:
-        return User(**user_data)
+    user = _user_model_cache.get(user_id)
+    if user is not None:
+        return user
+    row = _get_db().execute(
+        "SELECT * FROM users WHERE id = ?", (user_id,)
+    ).fetchone()
+    if row is not None:
+        user = _row_to_user(row)
+        _user_model_cache[user_id] = user
+        return user
     return None
 
 
@@ -209,10 +331,9 @@ async def get_optional_user(
         return None
 
 
+@lru_cache(maxsize=1)
 def get_google_auth_url() -> str:
-    """Generate Google OAuth authorization URL."""
-    from urllib.parse import urlencode
-    
+    """Generate Google OAuth authorization URL (static per process)."""
     params = {
         "client_id": settings.google_client_id,
         "redirect_uri": settings.google_redirect_uri,
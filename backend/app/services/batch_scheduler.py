@@ -0,0 +1,105 @@
+"""
+Inventix AI - SLM Batch Scheduler
+=================================
+Micro-batching layer in front of the SLM engine.
+
+Concurrent requests are coalesced into batched engine calls,
+amortizing per-call overhead across the batch.
+"""
+
+import asyncio
+from typing import List, Optional, Tuple
+
+from app.services.slm_engine import SLMEngine, SLMRequest, SLMResponse, slm_engine
+
+
+class BatchScheduler:
+    """
+    Coalesces concurrent SLM requests into batched calls.
+
+    Requests submitted via `submit()` are queued and drained by a single
+    background task. A batch is flushed when either `max_batch_size`
+    requests are waiting or `max_wait_ms` has elapsed since the first
+    request arrived - whichever comes first. Batches are grouped by
+    response_format so JSON-mode requests stay together, then dispatched
+    through `SLMEngine.generate_batch`.
+    """
+
+    def __init__(
+        self,
+        engine: Optional[SLMEngine] = None,
+        max_batch_size: int = 8,
+        max_wait_ms: int = 25
+    ):
+        self.engine = engine or slm_engine
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue: asyncio.Queue[Tuple[SLMRequest, asyncio.Future]] = asyncio.Queue()
+        self._drain_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start the background drain task."""
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.get_running_loop().create_task(self._drain_loop())
+
+    async def stop(self):
+        """Stop the background drain task."""
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+            try:
+                await self._drain_task
+            except asyncio.CancelledError:
+                pass
+            self._drain_task = None
+
+    async def submit(self, request: SLMRequest) -> SLMResponse:
+        """
+        Submit a request for batched execution.
+
+        Returns the per-request SLMResponse once its batch completes.
+        """
+        await self.start()  # Lazy start so direct calls outside lifespan still work
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((request, future))
+        return await future
+
+    async def _drain_loop(self):
+        """Drain the queue into batches and dispatch them."""
+        while True:
+            batch = [await self._queue.get()]
+            deadline = asyncio.get_running_loop().time() + (self.max_wait_ms / 1000)
+
+            # Collect until the batch is full or the wait window closes
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._dispatch(batch)
+
+    async def _dispatch(self, batch: List[Tuple[SLMRequest, asyncio.Future]]):
+        """Execute a batch grouped by response_format and resolve futures."""
+        groups: dict[str, List[Tuple[SLMRequest, asyncio.Future]]] = {}
+        for item in batch:
+            groups.setdefault(item[0].response_format, []).append(item)
+
+        for items in groups.values():
+            try:
+                responses = await self.engine.generate_batch([req for req, _ in items])
+            except Exception as e:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), response in zip(items, responses):
+                if not future.done():
+                    future.set_result(response)
+
+
+# Singleton instance
+batch_scheduler = BatchScheduler()
@@ -5,12 +5,31 @@ Keyword and concept extraction with evidence-locked processing.
 Uses deterministic + SLM-assisted extraction.
 """
 
+import heapq
 import re
 from collections import Counter
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+# Optional bounded counter for very long documents - a count-min
+# sketch keeps top-k selection accurate at a fixed memory budget
+# while an exact Counter over a 10MB document holds hundreds of
+# thousands of string keys.
+try:
+    from bounter import bounter
+except ImportError:
+    bounter = None
+
+# Token count above which the bounded counters take over
+_BOUNTER_TOKEN_THRESHOLD = 200_000
+
+# Tokenizer patterns, compiled once at import - re.compile inside the
+# hot extraction loops costs interpreter time even with re's cache.
+_WORD_RE = re.compile(r'\b[a-zA-Z][a-zA-Z0-9-]*[a-zA-Z0-9]\b|\b[a-zA-Z]\b')
+_SENT_RE = re.compile(r'[^.]+\.')
+_CONTEXT_TOKEN_RE = re.compile(r'[\w-]+%?')
+
 
 class ConceptCategory(str, Enum):
     """Categories of extracted concepts."""
@@ -57,7 +76,7 @@ class ConceptExtractor:
     """
 
     # Common stopwords to filter
-    STOPWORDS = {
+    STOPWORDS = frozenset({
         'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
         'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been',
         'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
@@ -71,7 +90,7 @@ class ConceptExtractor:
         'any', 'about', 'into', 'through', 'during', 'before', 'after',
         'above', 'below', 'up', 'down', 'out', 'off', 'over', 'under', 'again',
         'further', 'then', 'once', 'however', 'therefore', 'thus', 'hence'
-    }
+    })
 
     # Patterns for technical terms
     TECHNICAL_PATTERNS = [
@@ -83,15 +102,49 @@ class ConceptExtractor:
         r'\b[A-Z]{2,}(?:-[A-Z]+)*\b',  # Acronyms
     ]
 
+    # Single alternation compiled once per class - one scan over the
+    # document matches every technical pattern instead of six passes.
+    # All branches use non-capturing groups, so findall yields whole
+    # matches.
+    _TECHNICAL_COMBINED_RE = re.compile('|'.join(TECHNICAL_PATTERNS))
+
+    # Static SLM prompt scaffold - only the per-call fields are
+    # interpolated; the JSON schema block is never rebuilt.
+    _SLM_PROMPT_TEMPLATE = """Analyze these extracted terms from a {kind}:
+
+Terms: {terms}
+
+Text excerpt (first 1000 chars):
+{excerpt}
+
+Respond in JSON:
+{{
+    "differentiating_terms": ["term1", "term2"],  // Terms that appear novel or unique
+    "common_domain_terms": ["term3", "term4"],     // Standard domain vocabulary
+    "methodological_terms": ["term5", "term6"],    // Methods and approaches
+    "additional_concepts": ["concept1", "concept2"] // Important concepts missed
+}}
+
+Be conservative - only mark terms as differentiating if they represent genuinely novel combinations."""
+
+    # Hoisted out of the weighting loop - one shared mapping instead of
+    # a dict literal per concept.
+    _CATEGORY_BOOST = {
+        ConceptCategory.DIFFERENTIATING: 1.5,
+        ConceptCategory.TECHNICAL: 1.3,
+        ConceptCategory.METHODOLOGICAL: 1.2,
+        ConceptCategory.COMMON_DOMAIN: 1.0
+    }
+
     # Methodological keywords
-    METHODOLOGICAL_KEYWORDS = {
+    METHODOLOGICAL_KEYWORDS = frozenset({
         'method', 'approach', 'technique', 'algorithm', 'process', 'procedure',
         'framework', 'model', 'system', 'architecture', 'design', 'implementation',
         'analysis', 'synthesis', 'optimization', 'evaluation', 'validation',
         'training', 'testing', 'inference', 'preprocessing', 'postprocessing',
         'extraction', 'classification', 'detection', 'recognition', 'generation',
         'learning', 'regression', 'clustering', 'segmentation', 'transformation'
-    }
+    })
 
     def __init__(self):
         self.slm_engine = None
@@ -124,14 +177,18 @@ class ConceptExtractor:
             )
 
         try:
+            # Tokenize once; the deterministic and phrase passes share
+            # the same token list instead of re-scanning the document.
+            tokens = _WORD_RE.findall(text.lower())
+
             # Step 1: Deterministic extraction
-            deterministic_concepts = self._deterministic_extraction(text)
-            
+            deterministic_concepts = self._deterministic_extraction(tokens)
+
             # Step 2: Technical pattern extraction
             technical_concepts = self._extract_technical_terms(text)
-            
+
             # Step 3: Multi-word phrase extraction
-            phrase_concepts = self._extract_phrases(text)
+            phrase_concepts = self._extract_phrases(tokens)
             
             # Step 4: Combine and deduplicate
             all_concepts = self._merge_concepts(
@@ -181,16 +238,17 @@ class ConceptExtractor:
                 error_message=f"Concept extraction failed: {str(e)}"
             )
 
-    def _deterministic_extraction(self, text: str) -> List[Dict]:
-        """Extract keywords using deterministic methods."""
-        # Tokenize and clean
-        words = re.findall(r'\b[a-zA-Z][a-zA-Z0-9-]*[a-zA-Z0-9]\b|\b[a-zA-Z]\b', text.lower())
-        
+    def _deterministic_extraction(self, words: List[str]) -> List[Dict]:
+        """Extract keywords from the shared token list."""
         # Filter stopwords and short words
         filtered = [w for w in words if w not in self.STOPWORDS and len(w) > 2]
-        
-        # Count frequency
-        freq = Counter(filtered)
+
+        # Count frequency - bounded sketch for very long documents
+        if bounter is not None and len(filtered) > _BOUNTER_TOKEN_THRESHOLD:
+            freq = bounter(size_mb=64)
+            freq.update(filtered)
+        else:
+            freq = Counter(filtered)
         
         concepts = []
         for term, count in freq.most_common(100):
@@ -200,6 +258,7 @@ class ConceptExtractor:
             
             concepts.append({
                 'term': term,
+                'term_lower': term,
                 'frequency': count,
                 'category': category,
                 'source': 'deterministic'
@@ -209,76 +268,96 @@ class ConceptExtractor:
 
     def _extract_technical_terms(self, text: str) -> List[Dict]:
         """Extract technical terms using patterns."""
-        concepts = []
-        
-        for pattern in self.TECHNICAL_PATTERNS:
-            matches = re.findall(pattern, text)
-            for match in set(matches):
-                concepts.append({
-                    'term': match,
-                    'frequency': text.count(match),
-                    'category': ConceptCategory.TECHNICAL,
-                    'source': 'pattern'
-                })
-        
-        return concepts
+        # One Counter over all pattern hits replaces the per-match
+        # text.count scan.
+        freq = Counter(self._TECHNICAL_COMBINED_RE.findall(text))
+
+        return [
+            {
+                'term': term,
+                'term_lower': term.lower(),
+                'frequency': count,
+                'category': ConceptCategory.TECHNICAL,
+                'source': 'pattern'
+            }
+            for term, count in freq.items()
+        ]
 
-    def _extract_phrases(self, text: str) -> List[Dict]:
+    def _extract_phrases(self, tokens: List[str]) -> List[Dict]:
         """Extract multi-word phrases (bigrams and trigrams)."""
-        # Clean and tokenize
-        words = re.findall(r'\b[a-zA-Z][a-zA-Z0-9-]*[a-zA-Z0-9]\b', text.lower())
-        
-        # Generate bigrams
-        bigrams = []
-        for i in range(len(words) - 1):
-            if words[i] not in self.STOPWORDS and words[i+1] not in self.STOPWORDS:
-                bigrams.append(f"{words[i]} {words[i+1]}")
-        
-        # Generate trigrams
-        trigrams = []
-        for i in range(len(words) - 2):
-            if words[i] not in self.STOPWORDS and words[i+2] not in self.STOPWORDS:
-                trigrams.append(f"{words[i]} {words[i+1]} {words[i+2]}")
-        
-        # Count and filter
-        bigram_freq = Counter(bigrams)
-        trigram_freq = Counter(trigrams)
+        # Phrases skip single-letter tokens the shared tokenizer keeps
+        words = [w for w in tokens if len(w) > 1]
         
+        # Count tuple keys straight from generators - the joined phrase
+        # string is only built for the few top-k survivors below,
+        # instead of once per n-gram position. Stopword membership is
+        # resolved once per token; the n-gram filters then index a
+        # bool list instead of hashing the same token repeatedly.
+        sw = self.STOPWORDS
+        is_sw = [w in sw for w in words]
+        if bounter is not None and len(words) > _BOUNTER_TOKEN_THRESHOLD:
+            # bounter requires string keys, so the bounded path joins
+            # eagerly; it only runs on documents where exact counters
+            # would dominate memory anyway.
+            bigram_freq = bounter(size_mb=32)
+            bigram_freq.update(
+                f"{words[i]} {words[i + 1]}"
+                for i in range(len(words) - 1)
+                if not (is_sw[i] or is_sw[i + 1])
+            )
+            trigram_freq = bounter(size_mb=32)
+            trigram_freq.update(
+                f"{words[i]} {words[i + 1]} {words[i + 2]}"
+                for i in range(len(words) - 2)
+                if not (is_sw[i] or is_sw[i + 2])
+            )
+        else:
+            bigram_freq = Counter(
+                (words[i], words[i + 1])
+                for i in range(len(words) - 1)
+                if not (is_sw[i] or is_sw[i + 1])
+            )
+            trigram_freq = Counter(
+                (words[i], words[i + 1], words[i + 2])
+                for i in range(len(words) - 2)
+                if not (is_sw[i] or is_sw[i + 2])
+            )
+
         concepts = []
-        
+
         for phrase, count in bigram_freq.most_common(30):
             if count >= 2:  # Appearing at least twice
+                term = phrase if isinstance(phrase, str) else ' '.join(phrase)
                 concepts.append({
-                    'term': phrase,
+                    'term': term,
+                    'term_lower': term,
                     'frequency': count,
                     'category': ConceptCategory.COMMON_DOMAIN,
                     'source': 'phrase'
                 })
-        
+
         for phrase, count in trigram_freq.most_common(20):
             if count >= 2:
+                term = phrase if isinstance(phrase, str) else ' '.join(phrase)
                 concepts.append({
-                    'term': phrase,
+                    'term': term,
+                    'term_lower': term,
                     'frequency': count,
                     'category': ConceptCategory.COMMON_DOMAIN,
                     'source': 'phrase'
                 })
-        
+
         return concepts
 
     def _merge_concepts(self, *concept_lists) -> List[Dict]:
         """Merge concept lists, removing duplicates."""
-        seen = set()
-        merged = []
-        
+        # Producers cache term_lower at creation, so the merge is a
+        # single setdefault pass keyed on the precomputed form.
+        seen = {}
         for concepts in concept_lists:
             for concept in concepts:
-                term_lower = concept['term'].lower()
-                if term_lower not in seen:
-                    seen.add(term_lower)
-                    merged.append(concept)
-        
-        return merged
+                seen.setdefault(concept['term_lower'], concept)
+        return list(seen.values())
 
     async def _enhance_with_slm(
         self, 
@@ -288,59 +367,54 @@ class ConceptExtractor:
     ) -> List[Dict]:
         """Enhance concept extraction with SLM analysis."""
         try:
-            from app.services.slm_engine import SLMEngine, SLMRequest
-            
-            engine = SLMEngine()
-            
-            # Get top terms for SLM analysis
-            top_terms = [c['term'] for c in sorted(
-                concepts, 
-                key=lambda x: x['frequency'], 
-                reverse=True
-            )[:30]]
-            
-            prompt = f"""Analyze these extracted terms from a {'patent claim' if domain_context == 'patent' else 'research document'}:
+            from app.services.slm_engine import SLMRequest
+            from app.services.slm_cache import cached_generate, make_cache_key
 
-Terms: {', '.join(top_terms)}
+            # Top terms via a bounded heap - O(n log 30) instead of a
+            # full sort of every concept.
+            top_terms = [c['term'] for c in heapq.nlargest(
+                30, concepts, key=lambda x: x['frequency']
+            )]
 
-Text excerpt (first 1000 chars):
-{text[:1000]}
-
-Respond in JSON:
-{{
-    "differentiating_terms": ["term1", "term2"],  // Terms that appear novel or unique
-    "common_domain_terms": ["term3", "term4"],     // Standard domain vocabulary
-    "methodological_terms": ["term5", "term6"],    // Methods and approaches
-    "additional_concepts": ["concept1", "concept2"] // Important concepts missed
-}}
-
-Be conservative - only mark terms as differentiating if they represent genuinely novel combinations."""
+            prompt = self._SLM_PROMPT_TEMPLATE.format(
+                kind='patent claim' if domain_context == 'patent' else 'research document',
+                terms=', '.join(top_terms),
+                excerpt=text[:1000]
+            )
 
-            result = await engine.generate(SLMRequest(
+            # Content-addressed cache: re-running the same document
+            # (and domain) skips the SLM call entirely. The term list
+            # is derived from the text, so text + domain is a
+            # sufficient key.
+            result = await cached_generate(SLMRequest(
                 prompt=prompt,
                 system_prompt="You are ANTIGRAVITY, an evidence-locked concept analysis system. Be precise and conservative.",
                 response_format="json"
-            ))
+            ), key=make_cache_key(text, domain_context))
 
             if result.success and result.parsed_json:
                 parsed = result.parsed_json
                 
                 # Update categories based on SLM analysis
-                diff_terms = set(t.lower() for t in parsed.get("differentiating_terms", []))
-                method_terms = set(t.lower() for t in parsed.get("methodological_terms", []))
+                diff_terms = set(t.lower() for t in parsed.get("differentiating_terms", ()))
+                method_terms = set(t.lower() for t in parsed.get("methodological_terms", ()))
                 
                 for concept in concepts:
-                    term_lower = concept['term'].lower()
+                    term_lower = concept['term_lower']
                     if term_lower in diff_terms:
                         concept['category'] = ConceptCategory.DIFFERENTIATING
                     elif term_lower in method_terms:
                         concept['category'] = ConceptCategory.METHODOLOGICAL
                 
                 # Add any additional concepts found by SLM
-                for new_term in parsed.get("additional_concepts", []):
-                    if new_term.lower() not in {c['term'].lower() for c in concepts}:
+                existing = {c['term_lower'] for c in concepts}
+                for new_term in parsed.get("additional_concepts", ()):
+                    new_lower = new_term.lower()
+                    if new_lower not in existing:
+                        existing.add(new_lower)
                         concepts.append({
                             'term': new_term,
+                            'term_lower': new_lower,
                             'frequency': 1,
                             'category': ConceptCategory.DIFFERENTIATING,
                             'source': 'slm'
@@ -352,10 +426,35 @@ Be conservative - only mark terms as differentiating if they represent genuinely
         
         return concepts
 
+    def _build_context_index(self, concepts: List[Dict], text: str) -> Dict[str, str]:
+        """
+        Map each concept term to a sentence that contains it.
+
+        One pass over the text replaces the former per-concept regex
+        search: every sentence is tokenized once and its unigrams,
+        bigrams and trigrams are matched against the wanted terms.
+        """
+        wanted = {c['term_lower'] for c in concepts}
+        index: Dict[str, str] = {}
+        for match in _SENT_RE.finditer(text):
+            sentence = match.group(0).strip()
+            tokens = _CONTEXT_TOKEN_RE.findall(sentence.lower())
+            keys = set(tokens)
+            keys.update(f"{tokens[i]} {tokens[i+1]}" for i in range(len(tokens) - 1))
+            keys.update(
+                f"{tokens[i]} {tokens[i+1]} {tokens[i+2]}"
+                for i in range(len(tokens) - 2)
+            )
+            for key in keys & wanted:
+                index.setdefault(key, sentence[:200])
+            if len(index) == len(wanted):
+                break
+        return index
+
     def _weight_concepts(self, concepts: List[Dict], text: str) -> List[ExtractedConcept]:
         """Weight concepts by relevance and frequency."""
-        total_words = len(text.split())
         max_freq = max(c['frequency'] for c in concepts) if concepts else 1
+        context_index = self._build_context_index(concepts, text)
         
         weighted = []
         for concept in concepts:
@@ -367,27 +466,17 @@ Be conservative - only mark terms as differentiating if they represent genuinely
             if isinstance(category, str):
                 category = ConceptCategory(category)
             
-            category_boost = {
-                ConceptCategory.DIFFERENTIATING: 1.5,
-                ConceptCategory.TECHNICAL: 1.3,
-                ConceptCategory.METHODOLOGICAL: 1.2,
-                ConceptCategory.COMMON_DOMAIN: 1.0
-            }.get(category, 1.0)
+            category_boost = self._CATEGORY_BOOST.get(category, 1.0)
             
-            # Length bonus (multi-word phrases are often more specific)
-            length_bonus = 1.0 + (0.1 * len(concept['term'].split()) - 1)
+            # Length bonus (multi-word phrases are often more specific);
+            # terms are space-joined, so counting separators avoids a
+            # split-list allocation per concept.
+            length_bonus = 1.0 + (0.1 * (concept['term'].count(' ') + 1) - 1)
             
             weight = min(1.0, freq_score * category_boost * length_bonus)
             
-            # Find context (sentence containing the term)
-            context = None
-            pattern = re.compile(
-                rf'[^.]*\b{re.escape(concept["term"])}\b[^.]*\.',
-                re.IGNORECASE
-            )
-            match = pattern.search(text)
-            if match:
-                context = match.group(0).strip()[:200]
+            # Context sentence from the one-pass index
+            context = context_index.get(concept['term_lower'])
             
             weighted.append(ExtractedConcept(
                 term=concept['term'],
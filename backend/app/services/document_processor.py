@@ -5,13 +5,39 @@ Handles document ingestion for PDF, DOCX, and text input.
 Evidence-locked processing with structured error handling.
 """
 
+import asyncio
 import io
-import re
-from typing import Optional, Tuple
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, List, Optional, Union
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
 
+from app.core.text import count_words
+
+# PDF page decoding is CPU-bound pure Python in pypdf, so larger
+# documents are sharded across worker processes. The pool is created
+# lazily and kept for the life of the process.
+_PDF_PARALLEL_PAGE_THRESHOLD = 16
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """Return the shared extraction pool, creating it on first use."""
+    global _pdf_pool
+    if _pdf_pool is None:
+        _pdf_pool = ProcessPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+    return _pdf_pool
+
+
+def _extract_pdf_range(pdf_bytes: bytes, start: int, stop: int) -> List[str]:
+    """Extract text for pages [start, stop); runs in a worker process."""
+    import pypdf
+
+    reader = pypdf.PdfReader(io.BytesIO(pdf_bytes))
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
 
 class DocumentType(str, Enum):
     """Supported document types."""
@@ -63,26 +89,39 @@ class DocumentProcessor:
 
     SUPPORTED_EXTENSIONS = {'.pdf', '.docx', '.doc', '.txt'}
     MAX_DOCUMENT_SIZE = 10 * 1024 * 1024  # 10MB limit
+    MAX_TEXT_CHARS = 5_000_000  # Stop extracting pages past this budget
 
     def __init__(self):
-        self._pdf_available = self._check_pdf_support()
-        self._docx_available = self._check_docx_support()
+        self._pdf_backend = self._check_pdf_support()
+        self._pdf_available = self._pdf_backend is not None
+        self._docx_backend = self._check_docx_support()
+        self._docx_available = self._docx_backend is not None
 
-    def _check_pdf_support(self) -> bool:
-        """Check if PDF extraction is available."""
+    def _check_pdf_support(self) -> Optional[str]:
+        """Probe for a PDF backend, preferring the C-backed MuPDF."""
         try:
-            import pypdf
-            return True
+            import fitz  # noqa: F401 - availability probe
+            return "pymupdf"
         except ImportError:
-            return False
+            pass
+        try:
+            import pypdf  # noqa: F401 - availability probe
+            return "pypdf"
+        except ImportError:
+            return None
 
-    def _check_docx_support(self) -> bool:
-        """Check if DOCX extraction is available."""
+    def _check_docx_support(self) -> Optional[str]:
+        """Probe for a DOCX backend, preferring the streaming XML path."""
+        try:
+            import lxml.etree  # noqa: F401 - availability probe
+            return "lxml"
+        except ImportError:
+            pass
         try:
-            import docx
-            return True
+            import docx  # noqa: F401 - availability probe
+            return "python-docx"
         except ImportError:
-            return False
+            return None
 
     def detect_document_type(self, filename: str, content_type: Optional[str] = None) -> DocumentType:
         """Detect document type from filename or content type."""
@@ -105,19 +144,46 @@ class DocumentProcessor:
         
         return DocumentType.UNKNOWN
 
+    @staticmethod
+    def _as_stream(content: Union[bytes, BinaryIO]) -> BinaryIO:
+        """Wrap raw bytes in a stream; pass file-like objects through."""
+        return io.BytesIO(content) if isinstance(content, bytes) else content
+
+    @staticmethod
+    def _extract_pages_parallel(content: Union[bytes, BinaryIO], page_count: int) -> List[str]:
+        """Shard page extraction across the process pool, in order."""
+        if isinstance(content, bytes):
+            pdf_bytes = content
+        else:
+            content.seek(0)
+            pdf_bytes = content.read()
+
+        pool = _get_pdf_pool()
+        workers = min(4, os.cpu_count() or 1)
+        shard = -(-page_count // workers)  # ceil division
+        results = [
+            pool.submit(_extract_pdf_range, pdf_bytes, start, min(start + shard, page_count))
+            for start in range(0, page_count, shard)
+        ]
+        return [text for future in results for text in future.result()]
+
     def process_document(
-        self, 
-        content: bytes, 
+        self,
+        content: Union[bytes, BinaryIO],
         filename: str,
         content_type: Optional[str] = None
     ) -> DocumentResult:
         """
         Process a document and extract text.
-        
+
+        Accepts either raw bytes or a seekable binary file object (e.g. a
+        spooled upload); streamed callers are expected to enforce the size
+        cap while writing.
+
         Returns structured result with extracted text or error details.
         """
         # Validate size
-        if len(content) > self.MAX_DOCUMENT_SIZE:
+        if isinstance(content, bytes) and len(content) > self.MAX_DOCUMENT_SIZE:
             return DocumentResult(
                 success=False,
                 error_code="DOCUMENT_TOO_LARGE",
@@ -146,7 +212,26 @@ class DocumentProcessor:
                 error_message=f"Failed to process document: {str(e)}"
             )
 
-    def _process_pdf(self, content: bytes) -> DocumentResult:
+    async def process_document_async(
+        self,
+        content: Union[bytes, BinaryIO],
+        filename: str,
+        content_type: Optional[str] = None
+    ) -> DocumentResult:
+        """
+        Async wrapper for process_document.
+
+        Extraction is CPU-bound and can take hundreds of milliseconds;
+        running it on a worker thread keeps the event loop free for
+        concurrent requests. MuPDF and lxml release the GIL while
+        parsing, and the pypdf fallback already shards big documents
+        across the process pool.
+        """
+        return await asyncio.to_thread(
+            self.process_document, content, filename, content_type
+        )
+
+    def _process_pdf(self, content: Union[bytes, BinaryIO]) -> DocumentResult:
         """Extract text from PDF."""
         if not self._pdf_available:
             return DocumentResult(
@@ -156,11 +241,26 @@ class DocumentProcessor:
             )
 
         try:
-            import pypdf
-            
-            reader = pypdf.PdfReader(io.BytesIO(content))
-            
-            if len(reader.pages) == 0:
+            if self._pdf_backend == "pymupdf":
+                import fitz
+
+                if not isinstance(content, bytes):
+                    content.seek(0)
+                    content = content.read()
+                doc = fitz.open(stream=content, filetype="pdf")
+                page_count = doc.page_count
+                pages = (doc[i].get_text() for i in range(page_count))
+            else:
+                import pypdf
+
+                reader = pypdf.PdfReader(self._as_stream(content))
+                page_count = len(reader.pages)
+                if page_count > _PDF_PARALLEL_PAGE_THRESHOLD:
+                    pages = self._extract_pages_parallel(content, page_count)
+                else:
+                    pages = (reader.pages[i].extract_text() for i in range(page_count))
+
+            if page_count == 0:
                 return DocumentResult(
                     success=False,
                     error_code="EMPTY_PDF",
@@ -169,15 +269,23 @@ class DocumentProcessor:
 
             text_parts = []
             sections = []
-            
-            for page_num, page in enumerate(reader.pages):
-                page_text = page.extract_text()
+            total_chars = 0
+
+            for page_num, page_text in enumerate(pages):
+                # Stop assembling once the text budget is reached -
+                # downstream consumers truncate anyway, so the
+                # remaining pages of a very large PDF are dropped (and,
+                # on the sequential path, never parsed).
+                if total_chars >= self.MAX_TEXT_CHARS:
+                    break
                 if page_text:
+                    total_chars += len(page_text)
                     text_parts.append(page_text)
                     sections.append({
                         "type": "page",
                         "index": page_num + 1,
-                        "content": page_text[:500] + "..." if len(page_text) > 500 else page_text
+                        "content": page_text[:500],
+                        "truncated": len(page_text) > 500
                     })
 
             if not text_parts:
@@ -192,11 +300,12 @@ class DocumentProcessor:
             return DocumentResult(
                 success=True,
                 text=full_text,
-                word_count=len(full_text.split()),
+                word_count=count_words(full_text),
                 paragraph_count=len([p for p in full_text.split('\n\n') if p.strip()]),
                 sections=sections,
                 metadata={
-                    "page_count": len(reader.pages),
+                    "page_count": page_count,
+                    "pages_extracted": len(sections),
                     "document_type": "pdf"
                 }
             )
@@ -208,7 +317,44 @@ class DocumentProcessor:
                 error_message=f"Failed to extract text from PDF: {str(e)}"
             )
 
-    def _process_docx(self, content: bytes) -> DocumentResult:
+    # WordprocessingML namespace used by the streaming DOCX parser.
+    _DOCX_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+    @classmethod
+    def _iter_docx_paragraphs(cls, content: Union[bytes, BinaryIO]):
+        """
+        Stream paragraphs out of word/document.xml with iterparse.
+
+        Skips python-docx's full object model - each closed w:p element
+        is read, emitted, and cleared, so memory stays constant no
+        matter how long the document is.
+        """
+        import zipfile
+        from lxml import etree
+
+        w = cls._DOCX_NS
+        paragraphs = []
+        sections = []
+
+        with zipfile.ZipFile(cls._as_stream(content)) as archive:
+            with archive.open("word/document.xml") as stream:
+                for _, elem in etree.iterparse(stream, events=("end",), tag=f"{w}p"):
+                    text = "".join(node.text or "" for node in elem.iter(f"{w}t"))
+                    if text.strip():
+                        paragraphs.append(text)
+                        style = elem.find(f"{w}pPr/{w}pStyle")
+                        style_id = style.get(f"{w}val", "") if style is not None else ""
+                        if style_id.startswith("Heading"):
+                            sections.append({
+                                "type": "heading",
+                                "level": int(style_id[-1]) if style_id[-1].isdigit() else 1,
+                                "content": text
+                            })
+                    elem.clear()
+
+        return paragraphs, sections
+
+    def _process_docx(self, content: Union[bytes, BinaryIO]) -> DocumentResult:
         """Extract text from DOCX."""
         if not self._docx_available:
             return DocumentResult(
@@ -218,24 +364,27 @@ class DocumentProcessor:
             )
 
         try:
-            import docx
-            
-            doc = docx.Document(io.BytesIO(content))
-            
-            paragraphs = []
-            sections = []
-            
-            for para in doc.paragraphs:
-                if para.text.strip():
-                    paragraphs.append(para.text)
-                    
-                    # Detect section headers
-                    if para.style and 'Heading' in para.style.name:
-                        sections.append({
-                            "type": "heading",
-                            "level": int(para.style.name[-1]) if para.style.name[-1].isdigit() else 1,
-                            "content": para.text
-                        })
+            if self._docx_backend == "lxml":
+                paragraphs, sections = self._iter_docx_paragraphs(content)
+            else:
+                import docx
+
+                doc = docx.Document(self._as_stream(content))
+
+                paragraphs = []
+                sections = []
+
+                for para in doc.paragraphs:
+                    if para.text.strip():
+                        paragraphs.append(para.text)
+
+                        # Detect section headers
+                        if para.style and 'Heading' in para.style.name:
+                            sections.append({
+                                "type": "heading",
+                                "level": int(para.style.name[-1]) if para.style.name[-1].isdigit() else 1,
+                                "content": para.text
+                            })
 
             if not paragraphs:
                 return DocumentResult(
@@ -249,7 +398,7 @@ class DocumentProcessor:
             return DocumentResult(
                 success=True,
                 text=full_text,
-                word_count=len(full_text.split()),
+                word_count=count_words(full_text),
                 paragraph_count=len(paragraphs),
                 sections=sections,
                 metadata={
@@ -265,14 +414,15 @@ class DocumentProcessor:
                 error_message=f"Failed to extract text from DOCX: {str(e)}"
             )
 
-    def _process_text(self, content: bytes) -> DocumentResult:
+    def _process_text(self, content: Union[bytes, BinaryIO]) -> DocumentResult:
         """Process plain text content."""
         try:
-            # Try UTF-8 first, then fallback to latin-1
-            try:
-                text = content.decode('utf-8')
-            except UnicodeDecodeError:
-                text = content.decode('latin-1')
+            data = content if isinstance(content, bytes) else content.read()
+            # Decode once - errors='replace' handles non-UTF-8 input in
+            # the same pass instead of a failed decode plus a latin-1
+            # re-decode of the whole buffer.
+            text = data.decode('utf-8', errors='replace')
+            del data  # release the byte copy before normalization
 
             if not text.strip():
                 return DocumentResult(
@@ -287,7 +437,7 @@ class DocumentProcessor:
             return DocumentResult(
                 success=True,
                 text=normalized,
-                word_count=len(normalized.split()),
+                word_count=count_words(normalized),
                 paragraph_count=len(paragraphs),
                 metadata={"document_type": "text"}
             )
@@ -314,7 +464,7 @@ class DocumentProcessor:
         return DocumentResult(
             success=True,
             text=normalized,
-            word_count=len(normalized.split()),
+            word_count=count_words(normalized),
             paragraph_count=len(paragraphs),
             metadata={"document_type": "pasted_text"}
         )
@@ -327,23 +477,20 @@ class DocumentProcessor:
         - Preserves paragraph boundaries
         - Maintains technical terms and formatting
         """
-        # Replace multiple spaces with single space
-        text = re.sub(r'[ \t]+', ' ', text)
-        
         # Normalize line endings
         text = text.replace('\r\n', '\n').replace('\r', '\n')
-        
-        # Replace multiple newlines with double newline (paragraph boundary)
-        text = re.sub(r'\n{3,}', '\n\n', text)
-        
-        # Clean up leading/trailing whitespace per line while preserving structure
-        lines = [line.strip() for line in text.split('\n')]
-        text = '\n'.join(lines)
-        
+
+        # Collapse runs of spaces/tabs and trim each line in one
+        # C-level split/join pass per line - no regex engine involved.
+        text = '\n'.join(' '.join(line.split()) for line in text.split('\n'))
+
+        # Replace multiple newlines with double newline (paragraph
+        # boundary); each replace pass halves the longest run.
+        while '\n\n\n' in text:
+            text = text.replace('\n\n\n', '\n\n')
+
         # Remove leading/trailing whitespace from full text
-        text = text.strip()
-        
-        return text
+        return text.strip()
 
     def emit_crash_log(self, operation: str, result: DocumentResult) -> CrashLog:
         """Generate a structured crash log from a failed operation."""
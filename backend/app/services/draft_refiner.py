@@ -5,10 +5,95 @@ Refines user drafts while preserving original intent.
 Non-detectable, non-fabricated improvements.
 """
 
+import asyncio
+import itertools
+import re
+from collections import Counter
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from app.core.text import count_words, word_set_lower
+
+# Static prompt scaffolds, built once per process - only the
+# per-request fields are interpolated.
+_REFINE_PROMPT_TEMPLATE = """Refine the academic/technical draft below while preserving the original intent.
+
+Respond in JSON with this exact structure:
+{{
+    "refined_text": "The complete refined version of the text",
+    
+    "changes": [
+        {{
+            "type": "clarity" | "structure" | "precision" | "grammar" | "flow",
+            "original": "Original phrase or sentence",
+            "refined": "Refined version",
+            "reason": "Why this change was made",
+            "location": "paragraph 1" or similar
+        }}
+    ],
+    
+    "preserved_claims": ["List of key technical/scientific claims that were preserved exactly"],
+    
+    "confidence": "low" | "medium" | "high",
+    
+    "warnings": ["Any concerns about the refinement"]
+}}
+
+CRITICAL RULES - VIOLATIONS ARE STRICTLY PROHIBITED:
+1. NEVER add new technical claims, results, data, or citations
+2. NEVER invent or fabricate any information
+3. NEVER exaggerate novelty or importance
+4. PRESERVE all original technical assertions exactly
+5. MAINTAIN the author's original argumentation
+6. AVOID these AI-stylistic patterns: {artifacts}
+7. The refined text should read like careful human editing
+8. When in doubt, make fewer changes rather than more
+
+=== USER INPUT ===
+CHANGE LEVEL: {change_guidance}
+{focus_hint}
+{preserve_hint}
+
+ORIGINAL DRAFT:
+{original_text}"""
+
+_SECTION_PROMPT_TEMPLATE = """Refine the document section below.
+
+Respond in JSON:
+{{
+    "refined": "The refined section text",
+    "improvements_made": ["List of specific improvements"],
+    "preserved_elements": ["Key elements that were kept unchanged"],
+    "suggestions": ["Optional further improvements for human consideration"]
+}}
+
+RULES:
+- Preserve all factual claims
+- Do not add new information
+- Improve clarity and flow only
+- Write naturally, like a human editor
+
+=== USER INPUT ===
+SECTION TYPE: {section_type}
+{improvements_hint}
+
+SECTION:
+{section_text}"""
+
+
+# Claim-indicator patterns, compiled once at import. IGNORECASE
+# replaces the per-call text.lower() copy, and compile-once/match-many
+# skips pattern parsing on every refinement request.
+_CLAIM_PATTERNS = [
+    re.compile(p, re.IGNORECASE) for p in (
+        r'we (?:propose|present|introduce|demonstrate|show)\s+[^.]+\.',
+        r'(?:our|this)\s+(?:method|approach|system|technique|algorithm)\s+[^.]+\.',
+        r'the results (?:show|indicate|demonstrate|suggest)\s+[^.]+\.',
+        r'(?:achieved|obtained|measured|observed)\s+[^.]+(?:\d+%?|\d+\.\d+)[^.]*\.',
+    )
+]
+
 
 class RefinementType(str, Enum):
     """Types of refinement applied."""
@@ -87,6 +172,26 @@ class DraftRefiner:
         "cutting-edge",
     ]
 
+    # Value-to-member lookup; a plain dict get beats enum-constructor
+    # validation plus exception handling per change entry.
+    _RT_LOOKUP = {rt.value: rt for rt in RefinementType}
+
+    # Fragments used in every refinement prompt, built once
+    _AI_ARTIFACT_PROMPT_FRAGMENT = ', '.join(AI_ARTIFACTS[:5])
+    _CHANGE_GUIDANCE = {
+        "light": "Make minimal changes. Only fix clear errors and minor awkwardness.",
+        "moderate": "Make balanced improvements. Fix errors, improve clarity, but maintain original voice.",
+        "thorough": "Comprehensive refinement. Restructure as needed while preserving all claims."
+    }
+    _DEFAULT_GUIDANCE = "Make balanced improvements."
+
+    # Single alternation over all artifact literals - one pass over the
+    # draft instead of fifteen independent substring scans, and
+    # IGNORECASE avoids the full text.lower() copy.
+    _AI_ARTIFACT_RE = re.compile(
+        '|'.join(re.escape(a) for a in AI_ARTIFACTS), re.IGNORECASE
+    )
+
     def __init__(self):
         self.slm_engine = None
 
@@ -113,12 +218,15 @@ class DraftRefiner:
             return self._create_error_result("No text provided for refinement")
 
         try:
-            from app.services.slm_engine import SLMEngine, SLMRequest
-            
-            engine = SLMEngine()
-            
-            # Extract original claims to ensure preservation
-            original_claims = self._extract_claims(original_text)
+            from app.services.slm_engine import SLMRequest, truncate_for_prompt
+            from app.services.slm_cache import cached_generate, make_cache_key
+
+            # Claim extraction only needs the original text, so it
+            # runs on a worker thread concurrently with the LLM round
+            # trip below instead of ahead of it.
+            claims_task = asyncio.create_task(
+                asyncio.to_thread(self._extract_claims, original_text)
+            )
             
             focus_hint = ""
             if focus_areas:
@@ -129,57 +237,30 @@ class DraftRefiner:
                 preserve_hint = f"\n\nDo NOT modify these sections: {', '.join(preserve_sections)}"
 
             # Determine change level guidance
-            change_guidance = {
-                "light": "Make minimal changes. Only fix clear errors and minor awkwardness.",
-                "moderate": "Make balanced improvements. Fix errors, improve clarity, but maintain original voice.",
-                "thorough": "Comprehensive refinement. Restructure as needed while preserving all claims."
-            }.get(max_change_level, "Make balanced improvements.")
-
-            prompt = f"""Refine this academic/technical draft while preserving the original intent.
-
-ORIGINAL DRAFT:
-{original_text[:5000]}
-
-CHANGE LEVEL: {change_guidance}
-{focus_hint}
-{preserve_hint}
-
-Respond in JSON with this exact structure:
-{{
-    "refined_text": "The complete refined version of the text",
-    
-    "changes": [
-        {{
-            "type": "clarity" | "structure" | "precision" | "grammar" | "flow",
-            "original": "Original phrase or sentence",
-            "refined": "Refined version",
-            "reason": "Why this change was made",
-            "location": "paragraph 1" or similar
-        }}
-    ],
-    
-    "preserved_claims": ["List of key technical/scientific claims that were preserved exactly"],
-    
-    "confidence": "low" | "medium" | "high",
-    
-    "warnings": ["Any concerns about the refinement"]
-}}
+            change_guidance = self._CHANGE_GUIDANCE.get(
+                max_change_level, self._DEFAULT_GUIDANCE
+            )
 
-CRITICAL RULES - VIOLATIONS ARE STRICTLY PROHIBITED:
-1. NEVER add new technical claims, results, data, or citations
-2. NEVER invent or fabricate any information
-3. NEVER exaggerate novelty or importance
-4. PRESERVE all original technical assertions exactly
-5. MAINTAIN the author's original argumentation
-6. AVOID these AI-stylistic patterns: {', '.join(self.AI_ARTIFACTS[:5])}
-7. The refined text should read like careful human editing
-8. When in doubt, make fewer changes rather than more"""
+            prompt = _REFINE_PROMPT_TEMPLATE.format(
+                original_text=truncate_for_prompt(original_text, 5000),
+                change_guidance=change_guidance,
+                focus_hint=focus_hint,
+                preserve_hint=preserve_hint,
+                artifacts=self._AI_ARTIFACT_PROMPT_FRAGMENT
+            )
 
-            result = await engine.generate(SLMRequest(
+            # Content-addressed cache: iterating users resubmit the
+            # same draft with the same knobs far more often than not,
+            # and a hit skips the multi-second LLM round trip.
+            result = await cached_generate(SLMRequest(
                 prompt=prompt,
                 system_prompt="You are a careful academic editor. Your role is to improve clarity and fix errors, NOT to change content. Preserve all original claims. Write naturally, avoiding AI patterns.",
                 response_format="json"
+            ), key=make_cache_key(
+                "refine_draft", original_text, max_change_level,
+                focus_hint, preserve_hint
             ))
+            original_claims = await claims_task
 
             if not result.success or not result.parsed_json:
                 return self._create_error_result("Refinement could not be completed")
@@ -196,25 +277,22 @@ CRITICAL RULES - VIOLATIONS ARE STRICTLY PROHIBITED:
             # Check for AI artifacts in output
             artifact_warnings = self._check_for_artifacts(refined_text)
             
-            # Build changes list
+            # Build changes list - skip entries with unknown types
             changes = []
-            for change_data in parsed.get("changes", []):
-                try:
-                    changes.append(RefinementChange(
-                        type=RefinementType(change_data.get("type", "clarity")),
-                        original=change_data.get("original", ""),
-                        refined=change_data.get("refined", ""),
-                        reason=change_data.get("reason", ""),
-                        location=change_data.get("location")
-                    ))
-                except ValueError:
-                    continue  # Skip invalid refinement types
+            for change_data in parsed.get("changes", ()):
+                change_type = self._RT_LOOKUP.get(change_data.get("type", "clarity"))
+                if change_type is None:
+                    continue
+                changes.append(RefinementChange(
+                    type=change_type,
+                    original=change_data.get("original", ""),
+                    refined=change_data.get("refined", ""),
+                    reason=change_data.get("reason", ""),
+                    location=change_data.get("location")
+                ))
             
             # Count changes by type
-            change_summary = {}
-            for change in changes:
-                key = change.type.value
-                change_summary[key] = change_summary.get(key, 0) + 1
+            change_summary = dict(Counter(c.type.value for c in changes))
             
             all_warnings = (
                 parsed.get("warnings", []) + 
@@ -229,8 +307,8 @@ CRITICAL RULES - VIOLATIONS ARE STRICTLY PROHIBITED:
                 changes=changes,
                 change_summary=change_summary,
                 preserved_claims=parsed.get("preserved_claims", []),
-                word_count_original=len(original_text.split()),
-                word_count_refined=len(refined_text.split()),
+                word_count_original=count_words(original_text),
+                word_count_refined=count_words(refined_text),
                 confidence=parsed.get("confidence", "medium"),
                 warnings=all_warnings
             )
@@ -240,21 +318,15 @@ CRITICAL RULES - VIOLATIONS ARE STRICTLY PROHIBITED:
 
     def _extract_claims(self, text: str) -> List[str]:
         """Extract key claims/assertions from text."""
-        import re
-        
         claims = []
         
-        # Look for sentences with claim indicators
-        claim_patterns = [
-            r'we (?:propose|present|introduce|demonstrate|show)\s+[^.]+\.',
-            r'(?:our|this)\s+(?:method|approach|system|technique|algorithm)\s+[^.]+\.',
-            r'the results (?:show|indicate|demonstrate|suggest)\s+[^.]+\.',
-            r'(?:achieved|obtained|measured|observed)\s+[^.]+(?:\d+%?|\d+\.\d+)[^.]*\.',
-        ]
-        
-        for pattern in claim_patterns:
-            matches = re.findall(pattern, text.lower())
-            claims.extend(matches[:3])  # Limit per pattern
+        for pattern in _CLAIM_PATTERNS:
+            # islice stops each scan after three hits instead of
+            # matching the whole document and slicing afterwards.
+            claims.extend(
+                m.group(0).lower()
+                for m in itertools.islice(pattern.finditer(text), 3)
+            )
         
         return claims[:10]  # Return top 10 claims
 
@@ -265,16 +337,17 @@ CRITICAL RULES - VIOLATIONS ARE STRICTLY PROHIBITED:
     ) -> List[str]:
         """Check if original claims are preserved in refined text."""
         warnings = []
-        refined_lower = refined_text.lower()
+        # Tokenize the refined text once; each claim check is then a
+        # C-level set intersection instead of a full-text substring
+        # scan per word.
+        refined_tokens = word_set_lower(refined_text)
         
         for claim in original_claims:
             # Check if key parts of the claim are preserved
-            claim_words = set(claim.split())
-            significant_words = [w for w in claim_words if len(w) > 4]
+            significant_words = {w for w in claim.split() if len(w) > 4}
             
-            present_count = sum(1 for w in significant_words if w in refined_lower)
-            
-            if len(significant_words) > 0:
+            if significant_words:
+                present_count = len(significant_words & refined_tokens)
                 preservation_ratio = present_count / len(significant_words)
                 if preservation_ratio < 0.5:
                     warnings.append(
@@ -286,12 +359,11 @@ CRITICAL RULES - VIOLATIONS ARE STRICTLY PROHIBITED:
     def _check_for_artifacts(self, text: str) -> List[str]:
         """Check for AI-stylistic artifacts in refined text."""
         warnings = []
-        text_lower = text.lower()
         
-        found_artifacts = []
-        for artifact in self.AI_ARTIFACTS:
-            if artifact in text_lower:
-                found_artifacts.append(artifact)
+        # Deduplicate while keeping first-occurrence order
+        found_artifacts = list(dict.fromkeys(
+            m.group(0).lower() for m in self._AI_ARTIFACT_RE.finditer(text)
+        ))
         
         if found_artifacts:
             warnings.append(
@@ -325,32 +397,17 @@ CRITICAL RULES - VIOLATIONS ARE STRICTLY PROHIBITED:
         """
         Refine a specific section of a document.
         """
-        from app.services.slm_engine import SLMEngine, SLMRequest
-        
-        engine = SLMEngine()
-        
+        from app.services.slm_engine import SLMRequest, slm_engine as engine
+
         improvements_hint = ""
         if target_improvements:
             improvements_hint = f"\n\nTarget improvements: {', '.join(target_improvements)}"
 
-        prompt = f"""Refine this {section_type} section:
-
-{section_text}
-{improvements_hint}
-
-Respond in JSON:
-{{
-    "refined": "The refined section text",
-    "improvements_made": ["List of specific improvements"],
-    "preserved_elements": ["Key elements that were kept unchanged"],
-    "suggestions": ["Optional further improvements for human consideration"]
-}}
-
-RULES:
-- Preserve all factual claims
-- Do not add new information
-- Improve clarity and flow only
-- Write naturally, like a human editor"""
+        prompt = _SECTION_PROMPT_TEMPLATE.format(
+            section_type=section_type,
+            section_text=section_text,
+            improvements_hint=improvements_hint
+        )
 
         result = await engine.generate(SLMRequest(
             prompt=prompt,
@@ -369,3 +426,21 @@ RULES:
             "error": "Section refinement could not be completed",
             "original": section_text
         }
+
+    async def refine_sections(
+        self,
+        sections: List[Tuple[str, str]],
+        target_improvements: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """
+        Refine several sections concurrently.
+
+        Each entry is a (section_text, section_type) pair. Requests are
+        issued through the shared engine in one gather, so latency is
+        bounded by the slowest section instead of the sum; results come
+        back in input order. The engine's semaphore caps the fan-out.
+        """
+        return list(await asyncio.gather(*(
+            self.refine_section(text, section_type, target_improvements)
+            for text, section_type in sections
+        )))
@@ -0,0 +1,62 @@
+"""
+Inventix AI - Background Job Store
+==================================
+In-process submit-and-poll execution for long-running SLM work.
+
+Jobs run as asyncio tasks on the server's event loop; results are kept
+in a TTL-bounded map for polling. Swap the storage for Redis/arq when
+multi-process workers become necessary.
+"""
+
+import asyncio
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from cachetools import TTLCache
+
+
+@dataclass
+class Job:
+    """A submitted background job and its eventual result."""
+    id: str
+    status: str = "pending"  # pending | running | complete | failed
+    result: Optional[Any] = None
+    error: Optional[str] = None
+
+
+class JobStore:
+    """TTL-bounded registry of background SLM jobs."""
+
+    def __init__(self, maxsize: int = 1000, ttl: float = 3600.0):
+        self._jobs: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def submit(self, work: Callable[[], Awaitable[Any]]) -> str:
+        """Schedule `work` on the event loop and return its job id."""
+        job_id = uuid.uuid4().hex
+        job = Job(id=job_id)
+        self._jobs[job_id] = job
+        self._tasks[job_id] = asyncio.get_running_loop().create_task(
+            self._run(job, work)
+        )
+        return job_id
+
+    async def _run(self, job: Job, work: Callable[[], Awaitable[Any]]):
+        job.status = "running"
+        try:
+            job.result = await work()
+            job.status = "complete"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            self._tasks.pop(job.id, None)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return the job, or None if unknown or expired."""
+        return self._jobs.get(job_id)
+
+
+# Singleton instance
+job_store = JobStore()
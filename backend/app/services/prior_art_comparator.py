@@ -5,11 +5,46 @@ Semantic comparison of ideas against prior art.
 Evidence-locked with proper similarity scoring.
 """
 
-from typing import List, Dict, Optional, Tuple
+import asyncio
+from typing import List, Dict, Optional
 from dataclasses import dataclass
 from enum import Enum
 
 
+# Static prompt scaffolds, built once per process - only the
+# per-request fields are interpolated.
+_COMPARE_PROMPT_TEMPLATE = """Analyze the submission below for prior art overlap.
+
+Respond in JSON:
+{{
+    "prior_art_matches": [
+        {{
+            "title": "Name of similar existing work",
+            "source": "patent" | "paper",
+            "similarity_score": 0.5,
+            "overlap_description": "Brief description of overlap",
+            "overlapping_concepts": ["concept1", "concept2"],
+            "differentiating_aspects": ["unique aspect"],
+            "evidence": "Quote from text showing overlap"
+        }}
+    ],
+    "novel_aspects": ["List of novel elements"],
+    "overlapping_aspects": ["List of overlapping elements"],
+    "overall_risk_score": 0.4,
+    "confidence": "medium",
+    "summary": "Brief summary of novelty assessment",
+    "recommendations": ["Recommendation 1", "Recommendation 2"]
+}}
+
+Generate 2-3 realistic prior art matches. Be conservative.
+
+=== USER INPUT ===
+TYPE: {type_label}
+TITLE: {user_title}
+{concepts_hint}
+
+CONTENT: {content}"""
+
 class SimilarityLevel(str, Enum):
     """Similarity classification levels."""
     LOW = "low"
@@ -111,10 +146,9 @@ class PriorArtComparator:
 
         try:
             # Use SLM for semantic comparison
-            from app.services.slm_engine import SLMEngine, SLMRequest
-            
-            engine = SLMEngine()
-            
+            from app.services.slm_engine import SLMRequest, truncate_for_prompt
+            from app.services.slm_cache import cached_generate, make_cache_key
+
             # Build comparison prompt
             type_label = "patent claim" if project_type == "patent" else "research idea"
             art_label = "existing patents" if project_type == "patent" else "published research"
@@ -123,39 +157,21 @@ class PriorArtComparator:
             if extracted_concepts:
                 concepts_hint = f"\n\nKey concepts identified: {', '.join(extracted_concepts[:15])}"
 
-            prompt = f"""Analyze this {type_label} for prior art overlap:
-
-TITLE: {user_title}
-CONTENT: {user_text[:2500]}
-{concepts_hint}
-
-Respond in JSON:
-{{
-    "prior_art_matches": [
-        {{
-            "title": "Name of similar existing work",
-            "source": "{project_type}",
-            "similarity_score": 0.5,
-            "overlap_description": "Brief description of overlap",
-            "overlapping_concepts": ["concept1", "concept2"],
-            "differentiating_aspects": ["unique aspect"],
-            "evidence": "Quote from text showing overlap"
-        }}
-    ],
-    "novel_aspects": ["List of novel elements"],
-    "overlapping_aspects": ["List of overlapping elements"],
-    "overall_risk_score": 0.4,
-    "confidence": "medium",
-    "summary": "Brief summary of novelty assessment",
-    "recommendations": ["Recommendation 1", "Recommendation 2"]
-}}
-
-Generate 2-3 realistic prior art matches. Be conservative."""
+            prompt = _COMPARE_PROMPT_TEMPLATE.format(
+                type_label=type_label,
+                user_title=user_title,
+                content=truncate_for_prompt(user_text, 2500),
+                concepts_hint=concepts_hint
+            )
 
-            result = await engine.generate(SLMRequest(
+            # Repeat comparisons of the same document hit the shared
+            # response cache instead of re-running the assessment.
+            result = await cached_generate(SLMRequest(
                 prompt=prompt,
                 system_prompt="You are a prior art assessment system. Generate realistic, evidence-based assessments. Output valid JSON only.",
                 response_format="json"
+            ), key=make_cache_key(
+                "prior_art", user_title, user_text, project_type, concepts_hint
             ))
 
             if not result.success or not result.parsed_json:
@@ -208,23 +224,18 @@ Generate 2-3 realistic prior art matches. Be conservative."""
         except Exception as e:
             return self._create_fallback_assessment(f"Comparison failed: {str(e)}")
 
+    # Ordered by the 0.3/0.6 thresholds; (score >= 0.3) + (score >= 0.6)
+    # indexes straight into these without branching per match.
+    _LEVELS = (SimilarityLevel.LOW, SimilarityLevel.MEDIUM, SimilarityLevel.HIGH)
+    _RISKS = (NoveltyRisk.GREEN, NoveltyRisk.YELLOW, NoveltyRisk.RED)
+
     def _score_to_level(self, score: float) -> SimilarityLevel:
         """Convert numeric score to similarity level."""
-        if score >= 0.6:
-            return SimilarityLevel.HIGH
-        elif score >= 0.3:
-            return SimilarityLevel.MEDIUM
-        else:
-            return SimilarityLevel.LOW
+        return self._LEVELS[(score >= 0.3) + (score >= 0.6)]
 
     def _score_to_risk(self, score: float) -> NoveltyRisk:
         """Convert risk score to traffic light classification."""
-        if score >= 0.6:
-            return NoveltyRisk.RED  # High overlap
-        elif score >= 0.3:
-            return NoveltyRisk.YELLOW  # Moderate overlap
-        else:
-            return NoveltyRisk.GREEN  # Low overlap
+        return self._RISKS[(score >= 0.3) + (score >= 0.6)]
 
     def _create_fallback_assessment(self, error_msg: str) -> NoveltyAssessment:
         """Create a fallback assessment when analysis fails."""
@@ -252,8 +263,26 @@ Generate 2-3 realistic prior art matches. Be conservative."""
     ) -> Dict:
         """
         Clause-level comparison for patent claims.
-        
-        Analyzes each claim individually for prior art overlap.
+
+        Analyzes each claim individually for prior art overlap. Claims
+        are fanned out as one SLM request each rather than a single
+        mega-prompt: prefill stays short, claims decode concurrently,
+        and one failed claim degrades alone instead of sinking the set.
+        """
+        return await self.compare_claims_parallel(user_claims, project_title)
+
+    async def compare_claims_parallel(
+        self,
+        user_claims: List[str],
+        project_title: str
+    ) -> Dict:
+        """
+        Clause-level comparison with one SLM request per claim.
+
+        Claims are analyzed concurrently through the shared engine and
+        reassembled in claim order, so wall time tracks the slowest
+        claim rather than the sum. Falls back per-claim: a failed
+        analysis yields an "unknown" entry instead of sinking the set.
         """
         if not user_claims:
             return {
@@ -261,45 +290,49 @@ Generate 2-3 realistic prior art matches. Be conservative."""
                 "error": "No claims provided"
             }
 
-        from app.services.slm_engine import SLMEngine, SLMRequest
-        
-        engine = SLMEngine()
-        
-        claims_text = "\n".join([f"Claim {i+1}: {c}" for i, c in enumerate(user_claims)])
-        
-        prompt = f"""Analyze these patent claims for prior art risks:
+        from app.services.slm_engine import SLMRequest, slm_engine as engine
 
-{claims_text}
+        def claim_request(index: int, claim: str) -> SLMRequest:
+            return SLMRequest(
+                prompt=f"""Analyze the patent claim below for prior art risks.
 
-For each claim, respond in JSON:
+Respond in JSON:
 {{
-    "claims_analysis": [
-        {{
-            "claim_number": 1,
-            "risk_level": "low" | "medium" | "high",
-            "similar_prior_art": "Description of similar existing claims",
-            "differentiating_elements": ["What makes this claim unique"],
-            "recommendation": "How to strengthen this claim"
-        }}
-    ],
-    "overall_assessment": "Summary of the claims set",
-    "strongest_claim": 1,
-    "weakest_claim": 2
-}}"""
-
-        result = await engine.generate(SLMRequest(
-            prompt=prompt,
-            system_prompt="You are ANTIGRAVITY, analyzing patent claims. Be thorough and evidence-based.",
-            response_format="json"
+    "risk_level": "low" | "medium" | "high",
+    "similar_prior_art": "Description of similar existing claims",
+    "differentiating_elements": ["What makes this claim unique"],
+    "recommendation": "How to strengthen this claim"
+}}
+
+=== USER INPUT ===
+Claim {index + 1}: {claim}""",
+                system_prompt="You are ANTIGRAVITY, analyzing patent claims. Be thorough and evidence-based.",
+                response_format="json"
+            )
+
+        results = await asyncio.gather(*(
+            engine.generate(claim_request(i, claim))
+            for i, claim in enumerate(user_claims)
         ))
 
-        if result.success and result.parsed_json:
-            return {
-                "success": True,
-                **result.parsed_json
-            }
-        
+        risk_rank = {"low": 0, "medium": 1, "high": 2}
+        claims_analysis = []
+        for i, result in enumerate(results):
+            if result.success and result.parsed_json:
+                claims_analysis.append({"claim_number": i + 1, **result.parsed_json})
+            else:
+                claims_analysis.append({
+                    "claim_number": i + 1,
+                    "risk_level": "unknown",
+                    "similar_prior_art": "",
+                    "differentiating_elements": [],
+                    "recommendation": "Analysis could not be completed; retry this claim"
+                })
+
+        ranked = [c for c in claims_analysis if c["risk_level"] in risk_rank]
         return {
-            "success": False,
-            "error": "Claim analysis could not be completed"
+            "success": any(r.success for r in results),
+            "claims_analysis": claims_analysis,
+            "strongest_claim": min(ranked, key=lambda c: risk_rank[c["risk_level"]])["claim_number"] if ranked else None,
+            "weakest_claim": max(ranked, key=lambda c: risk_rank[c["risk_level"]])["claim_number"] if ranked else None
         }
@@ -4,64 +4,201 @@ Inventix AI - Project Service
 Project CRUD operations and analysis.
 """
 
-import json
+import asyncio
+import os
+import threading
 import uuid
+
+import orjson
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
-from app.config import settings
 from app.core.project_schemas import (
-    Project, ProjectCreate, ProjectUpdate, ProjectCard, ProjectList,
-    ProjectAnalysis, ProjectType, NoveltyStatus, PipelineStage,
-    Roadmap, RoadmapPhase, RoadmapMilestone, RoadmapCreate,
+    Project, ProjectAnalysis, ProjectCreate, ProjectUpdate, ProjectCard, ProjectList,
+    ProjectType, NoveltyStatus, PipelineStage,
+    Roadmap, RoadmapPhase, RoadmapMilestone,
     PipelineStatus, PipelineNode
 )
-from app.services.slm_engine import SLMEngine
+from app.services.slm_engine import slm_engine, truncate_for_prompt
 
-# Simple file-based storage for MVP
+# Simple file-based storage for MVP: one JSON file per record, so a
+# mutation rewrites only that record instead of the whole store. The
+# legacy single-file layout is migrated into shards on first access.
 DATA_DIR = Path(__file__).parent.parent.parent / "data"
-PROJECTS_FILE = DATA_DIR / "projects.json"
-ROADMAPS_FILE = DATA_DIR / "roadmaps.json"
+PROJECTS_FILE = DATA_DIR / "projects.json"  # legacy, migrated on startup
+ROADMAPS_FILE = DATA_DIR / "roadmaps.json"  # legacy, migrated on startup
+PROJECTS_DIR = DATA_DIR / "projects"
+ROADMAPS_DIR = DATA_DIR / "roadmaps"
 
 
-def _ensure_data_dir():
-    """Ensure data directory exists."""
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    if not PROJECTS_FILE.exists():
-        PROJECTS_FILE.write_text("{}")
-    if not ROADMAPS_FILE.exists():
-        ROADMAPS_FILE.write_text("{}")
+# mtime-validated parse caches: the JSON stores are re-read from disk
+# only when another writer has changed the file, so multi-step flows
+# pay one stat() instead of a full reparse per helper call. The lock
+# guards cache consistency across FastAPI's worker threads.
+_PROJ_CACHE = {"mtime": 0, "data": None}
+_ROAD_CACHE = {"mtime": 0, "data": None}
+_cache_lock = threading.RLock()
 
 
-def _load_projects() -> dict:
-    """Load projects from file."""
-    _ensure_data_dir()
+def _migrate_legacy_store(legacy_file: Path, shard_dir: Path):
+    """One-time split of a single-file store into per-record shards."""
+    if not legacy_file.exists():
+        return
     try:
-        return json.loads(PROJECTS_FILE.read_text())
+        legacy = orjson.loads(legacy_file.read_bytes())
     except Exception:
-        return {}
+        legacy = {}
+    for record_id, record in legacy.items():
+        shard = shard_dir / f"{record_id}.json"
+        if not shard.exists():
+            shard.write_bytes(orjson.dumps(record, default=str))
+    legacy_file.rename(legacy_file.with_suffix(".json.migrated"))
 
 
-def _save_projects(projects: dict):
-    """Save projects to file."""
-    _ensure_data_dir()
-    PROJECTS_FILE.write_text(json.dumps(projects, indent=2, default=str))
+_data_dir_ready = False
 
 
-def _load_roadmaps() -> dict:
-    """Load roadmaps from file."""
+def _ensure_data_dir():
+    """Ensure the sharded data directories exist, migrating legacy files.
+
+    Runs the mkdir/migration work once per process; subsequent calls
+    are a single flag check, keeping stat/mkdir syscalls off the hot
+    CRUD paths.
+    """
+    global _data_dir_ready
+    if _data_dir_ready:
+        return
+    PROJECTS_DIR.mkdir(parents=True, exist_ok=True)
+    ROADMAPS_DIR.mkdir(parents=True, exist_ok=True)
+    _migrate_legacy_store(PROJECTS_FILE, PROJECTS_DIR)
+    _migrate_legacy_store(ROADMAPS_FILE, ROADMAPS_DIR)
+    _data_dir_ready = True
+
+
+def _load_cached(shard_dir: Path, cache: dict, model=None) -> dict:
+    """
+    Load a sharded store through its directory-mtime cache.
+
+    When `model` is given, records are validated into model instances
+    once at parse time; cache hits then hand back ready-to-use objects
+    instead of re-running Pydantic validation on every access.
+    """
     _ensure_data_dir()
-    try:
-        return json.loads(ROADMAPS_FILE.read_text())
-    except Exception:
-        return {}
+    with _cache_lock:
+        try:
+            mtime = shard_dir.stat().st_mtime_ns
+            if cache["data"] is not None and mtime == cache["mtime"]:
+                return cache["data"]
+            data = {
+                shard.stem: orjson.loads(shard.read_bytes())
+                for shard in shard_dir.glob("*.json")
+            }
+            if model is not None:
+                data = {rid: model(**record) for rid, record in data.items()}
+        except Exception:
+            return {}
+        cache["data"] = data
+        cache["mtime"] = mtime
+        return data
+
+
+def _save_record(shard_dir: Path, cache: dict, record_id: str, record: dict, cached=None):
+    """
+    Atomically write one record's shard and refresh the cache.
+
+    Only the mutated record is serialized - no full-store rewrite -
+    and tmp-then-replace keeps readers from ever seeing a torn file.
+    `cached` lets model-backed stores keep the live instance in the
+    cache while the plain dict goes to disk.
+    """
+    _ensure_data_dir()
+    with _cache_lock:
+        tmp = shard_dir / f".{record_id}.tmp"
+        tmp.write_bytes(orjson.dumps(record, default=str))
+        os.replace(tmp, shard_dir / f"{record_id}.json")
+        if cache["data"] is not None:
+            cache["data"][record_id] = cached if cached is not None else record
+        cache["mtime"] = shard_dir.stat().st_mtime_ns
 
 
-def _save_roadmaps(roadmaps: dict):
-    """Save roadmaps to file."""
+def _delete_record(shard_dir: Path, cache: dict, record_id: str):
+    """Remove one record's shard and evict it from the cache."""
     _ensure_data_dir()
-    ROADMAPS_FILE.write_text(json.dumps(roadmaps, indent=2, default=str))
+    with _cache_lock:
+        (shard_dir / f"{record_id}.json").unlink(missing_ok=True)
+        if cache["data"] is not None:
+            cache["data"].pop(record_id, None)
+        cache["mtime"] = shard_dir.stat().st_mtime_ns
+
+
+def _load_projects() -> dict:
+    """Load projects as validated Project models from the sharded store."""
+    return _load_cached(PROJECTS_DIR, _PROJ_CACHE, model=Project)
+
+
+def _save_project_record(project_id: str, project: Project):
+    """Persist a single project record."""
+    _save_record(PROJECTS_DIR, _PROJ_CACHE, project_id, project.model_dump(), cached=project)
+
+
+def _load_roadmaps() -> dict:
+    """Load roadmaps from the sharded store."""
+    return _load_cached(ROADMAPS_DIR, _ROAD_CACHE)
+
+
+def _save_roadmap_record(project_id: str, record: dict):
+    """Persist a single roadmap record."""
+    _save_record(ROADMAPS_DIR, _ROAD_CACHE, project_id, record)
+
+
+# Secondary index: user_id -> project ids sorted by created_at.
+# Rebuilt lazily when the projects cache picks up a new file version,
+# so reads on an unchanged store are O(own projects) with no per-call
+# sort - the dashboard listing just walks the list in reverse.
+_USER_INDEX = {"mtime": -1, "index": {}}
+
+
+def _get_user_index() -> dict:
+    """Return the user_id -> sorted (created_at, project_id) index."""
+    projects = _load_projects()
+    with _cache_lock:
+        if _USER_INDEX["mtime"] != _PROJ_CACHE["mtime"]:
+            index = {}
+            for project_id, project in projects.items():
+                index.setdefault(project.user_id, []).append(
+                    (project.created_at, project_id)
+                )
+            for entries in index.values():
+                entries.sort()
+            _USER_INDEX["index"] = index
+            _USER_INDEX["mtime"] = _PROJ_CACHE["mtime"]
+        return _USER_INDEX["index"]
+
+
+# Secondary index: project_id -> {phase_id: (phase_idx, {milestone_id:
+# milestone_idx})}. Rebuilt lazily alongside the roadmap cache so
+# milestone updates are O(1) lookups instead of nested linear scans.
+_MILESTONE_INDEX = {"mtime": -1, "index": {}}
+
+
+def _get_milestone_index() -> dict:
+    """Return the phase/milestone position index for the current store."""
+    roadmaps = _load_roadmaps()
+    with _cache_lock:
+        if _MILESTONE_INDEX["mtime"] != _ROAD_CACHE["mtime"]:
+            _MILESTONE_INDEX["index"] = {
+                project_id: {
+                    phase["id"]: (
+                        i,
+                        {m["id"]: j for j, m in enumerate(phase.get("milestones", []))},
+                    )
+                    for i, phase in enumerate(roadmap.get("phases", []))
+                }
+                for project_id, roadmap in roadmaps.items()
+            }
+            _MILESTONE_INDEX["mtime"] = _ROAD_CACHE["mtime"]
+        return _MILESTONE_INDEX["index"]
 
 
 def _novelty_score_to_status(score: float) -> NoveltyStatus:
@@ -76,8 +213,6 @@ def _novelty_score_to_status(score: float) -> NoveltyStatus:
 
 def create_project(user_id: str, data: ProjectCreate) -> Project:
     """Create a new project."""
-    projects = _load_projects()
-    
     project_id = str(uuid.uuid4())
     now = datetime.utcnow()
     
@@ -94,8 +229,7 @@ def create_project(user_id: str, data: ProjectCreate) -> Project:
         progress=0.0
     )
     
-    projects[project_id] = project.model_dump()
-    _save_projects(projects)
+    _save_project_record(project_id, project)
     
     # Auto-generate roadmap
     _create_default_roadmap(project_id, data.project_type)
@@ -106,10 +240,10 @@ def create_project(user_id: str, data: ProjectCreate) -> Project:
 def get_project(project_id: str, user_id: str) -> Optional[Project]:
     """Get a project by ID."""
     projects = _load_projects()
-    project_data = projects.get(project_id)
+    project = projects.get(project_id)
     
-    if project_data and project_data.get("user_id") == user_id:
-        return Project(**project_data)
+    if project and project.user_id == user_id:
+        return project
     return None
 
 
@@ -118,103 +252,72 @@ def get_user_projects(user_id: str) -> ProjectList:
     projects = _load_projects()
     user_projects = []
     
-    for project_data in projects.values():
-        if project_data.get("user_id") == user_id:
-            # Create ProjectCard
-            analysis = project_data.get("analysis")
-            novelty_status = NoveltyStatus.UNKNOWN
-            if analysis:
-                novelty_status = analysis.get("novelty_status", NoveltyStatus.UNKNOWN)
+    # The index is presorted by created_at; walking it in reverse gives
+    # newest-first without a per-request sort.
+    for _, project_id in reversed(_get_user_index().get(user_id, ())):
+        project = projects.get(project_id)
+        if project is not None:
+            # The fields come straight off an already-validated Project,
+            # so skip re-validating every card on this hot listing path.
+            analysis = project.analysis
+            novelty_status = analysis.novelty_status if analysis else NoveltyStatus.UNKNOWN.value
             
-            card = ProjectCard(
-                id=project_data["id"],
-                title=project_data["title"],
-                project_type=project_data["project_type"],
+            card = ProjectCard.model_construct(
+                id=project.id,
+                title=project.title,
+                project_type=project.project_type,
                 novelty_status=novelty_status,
-                progress=project_data.get("progress", 0.0),
-                last_analyzed=project_data.get("last_analyzed"),
-                created_at=project_data["created_at"]
+                progress=project.progress,
+                last_analyzed=project.last_analyzed,
+                created_at=project.created_at
             )
             user_projects.append(card)
     
-    # Sort by created_at descending
-    user_projects.sort(key=lambda x: x.created_at, reverse=True)
-    
-    return ProjectList(projects=user_projects, total=len(user_projects))
+    return ProjectList.model_construct(projects=user_projects, total=len(user_projects))
 
 
 def update_project(project_id: str, user_id: str, data: ProjectUpdate) -> Optional[Project]:
     """Update a project."""
     projects = _load_projects()
-    project_data = projects.get(project_id)
+    project = projects.get(project_id)
     
-    if not project_data or project_data.get("user_id") != user_id:
+    if not project or project.user_id != user_id:
         return None
     
     # Update fields
     if data.title is not None:
-        project_data["title"] = data.title
+        project.title = data.title
     if data.description is not None:
-        project_data["description"] = data.description
+        project.description = data.description
     if data.document_text is not None:
-        project_data["document_text"] = data.document_text
+        project.document_text = data.document_text
     
-    project_data["updated_at"] = datetime.utcnow().isoformat()
+    project.updated_at = datetime.utcnow()
     
-    projects[project_id] = project_data
-    _save_projects(projects)
+    _save_project_record(project_id, project)
     
-    return Project(**project_data)
+    return project
 
 
 def delete_project(project_id: str, user_id: str) -> bool:
     """Delete a project."""
     projects = _load_projects()
-    project_data = projects.get(project_id)
+    project = projects.get(project_id)
     
-    if not project_data or project_data.get("user_id") != user_id:
+    if not project or project.user_id != user_id:
         return False
     
-    del projects[project_id]
-    _save_projects(projects)
+    _delete_record(PROJECTS_DIR, _PROJ_CACHE, project_id)
     
     # Also delete roadmap
-    roadmaps = _load_roadmaps()
-    if project_id in roadmaps:
-        del roadmaps[project_id]
-        _save_roadmaps(roadmaps)
+    _delete_record(ROADMAPS_DIR, _ROAD_CACHE, project_id)
     
     return True
 
 
-async def analyze_project(project_id: str, user_id: str) -> Optional[Project]:
-    """Analyze a project and update its novelty indicators."""
-    projects = _load_projects()
-    project_data = projects.get(project_id)
-    
-    if not project_data or project_data.get("user_id") != user_id:
-        return None
-    
-    # Update pipeline status
-    project_data["pipeline_stage"] = PipelineStage.ANALYZING.value
-    project_data["progress"] = 50.0
-    projects[project_id] = project_data
-    _save_projects(projects)
-    
-    # Prepare analysis input
-    analysis_text = project_data.get("document_text") or project_data.get("description", "")
-    project_type = project_data.get("project_type", "research")
-    title = project_data.get("title", "")
-    
-    # Use SLM Engine for comprehensive analysis
-    engine = SLMEngine()
-    
-    # Build comprehensive analysis prompt
-    prompt = f"""Analyze this {'patent claim' if project_type == 'patent' else 'research idea'} comprehensively.
-
-TITLE: {title}
-
-{'CLAIM' if project_type == 'patent' else 'IDEA'}: {analysis_text}
+# Static prompt skeleton for analyze_project: instructions and schema
+# first so the variable user content sits at the tail of the prompt.
+_ANALYSIS_PROMPT_TEMPLATE = """Analyze this {kind} comprehensively.
 
 You must respond in valid JSON with this exact structure:
 {{
@@ -244,35 +347,90 @@ Guidelines:
 - novel_claims: Identify 2-4 potentially patentable/publishable unique aspects
 - prior_art_matches: List 2-4 related existing works with similarity scores
 - recommendations: Provide 2-3 actionable next steps
-- IMPORTANT: All scores are PROBABILISTIC ESTIMATES, not legal conclusions"""
+- IMPORTANT: All scores are PROBABILISTIC ESTIMATES, not legal conclusions
+
+=== USER INPUT ===
+TITLE: {title}
+
+{label}: {body}"""
+
+
+# Analysis returned when the SLM call fails; built once and shallow-
+# copied per use. ProjectAnalysis validation copies the nested lists,
+# so sharing them across failures is safe.
+_FALLBACK_ANALYSIS = {
+    "novelty_score": 0.5,
+    "novelty_status": NoveltyStatus.YELLOW.value,
+    "confidence_score": 50,
+    "confidence": "low",
+    "risk_level": "medium",
+    "risk_factors": ["Unable to complete full analysis"],
+    "risk_summary": "Analysis could not be completed fully. Please try again.",
+    "key_concepts": [],
+    "potential_overlaps": [],
+    "novel_claims": [],
+    "prior_art_matches": [],
+    "recommendations": [
+        {"title": "Retry Analysis", "description": "Please try running the analysis again", "priority": "high"}
+    ],
+    "summary": "The analysis could not be completed. Please ensure your description is detailed enough and try again."
+}
 
+
+async def analyze_project(project_id: str, user_id: str) -> Optional[Project]:
+    """Analyze a project and update its novelty indicators."""
+    projects = await asyncio.to_thread(_load_projects)
+    project = projects.get(project_id)
+    
+    if not project or project.user_id != user_id:
+        return None
+    
+    # Update pipeline status. The intermediate persist only exists so
+    # pollers see ANALYZING - run it in a worker thread overlapped with
+    # the SLM call instead of blocking the event loop on disk I/O.
+    project.pipeline_stage = PipelineStage.ANALYZING.value
+    project.progress = 50.0
+    save_task = asyncio.create_task(
+        asyncio.to_thread(_save_project_record, project_id, project.model_copy())
+    )
+    
+    # Prepare analysis input
+    analysis_text = project.document_text or project.description or ""
+    project_type = project.project_type
+    title = project.title
+    
+    kind, label = (
+        ("patent claim", "CLAIM") if project_type == "patent"
+        else ("research idea", "IDEA")
+    )
+    prompt = _ANALYSIS_PROMPT_TEMPLATE.format(
+        kind=kind,
+        label=label,
+        title=title,
+        body=truncate_for_prompt(analysis_text, 6000),
+    )
+
+    # Content-addressed cache: an analysis is deterministic for a given
+    # (title, text, type), so re-analyzing an unchanged project skips
+    # the LLM entirely and editing the text naturally changes the key.
+    from app.services.batch_scheduler import batch_scheduler
     from app.services.slm_engine import SLMRequest
-    result = await engine.generate(SLMRequest(
+    from app.services.slm_cache import cached_generate, make_cache_key
+    result = await cached_generate(SLMRequest(
         prompt=prompt,
         system_prompt="You are ANTIGRAVITY, an evidence-locked analysis system. Provide comprehensive, balanced analysis. Output only valid JSON.",
         response_format="json"
-    ))
-    
+    ), key=make_cache_key("analyze_project", title, analysis_text, project_type),
+        generate=batch_scheduler.submit)
+
+    # Settle the status write before mutating/saving the final record so
+    # the two writes cannot land out of order.
+    await save_task
+
     # Parse analysis results
     if not result.success or not result.parsed_json:
-        # Default fallback analysis
-        analysis_data = {
-            "novelty_score": 0.5,
-            "novelty_status": NoveltyStatus.YELLOW.value,
-            "confidence_score": 50,
-            "confidence": "low",
-            "risk_level": "medium",
-            "risk_factors": ["Unable to complete full analysis"],
-            "risk_summary": "Analysis could not be completed fully. Please try again.",
-            "key_concepts": [],
-            "potential_overlaps": [],
-            "novel_claims": [],
-            "prior_art_matches": [],
-            "recommendations": [
-                {"title": "Retry Analysis", "description": "Please try running the analysis again", "priority": "high"}
-            ],
-            "summary": "The analysis could not be completed. Please ensure your description is detailed enough and try again."
-        }
+        # Default fallback analysis (static template copied per use)
+        analysis_data = dict(_FALLBACK_ANALYSIS)
     else:
         parsed = result.parsed_json
         novelty_score = parsed.get("novelty_score", 0.5)
@@ -294,66 +452,55 @@ Guidelines:
         }
     
     # Update project with analysis
-    project_data["analysis"] = analysis_data
-    project_data["last_analyzed"] = datetime.utcnow().isoformat()
-    project_data["pipeline_stage"] = PipelineStage.COMPLETE.value
-    project_data["progress"] = 100.0
-    project_data["updated_at"] = datetime.utcnow().isoformat()
+    now = datetime.utcnow()
+    project.analysis = ProjectAnalysis(**analysis_data)
+    project.last_analyzed = now
+    project.pipeline_stage = PipelineStage.COMPLETE.value
+    project.progress = 100.0
+    project.updated_at = now
     
-    projects[project_id] = project_data
-    _save_projects(projects)
+    await asyncio.to_thread(_save_project_record, project_id, project)
     
-    return Project(**project_data)
+    return project
+
+
+# Pipeline visualization nodes as (id, name, band_lo, band_hi): a node
+# is active while overall progress sits inside its band and complete
+# past it. The "engine" name is resolved per project type below.
+_PIPELINE_NODES = (
+    ("input", "User Input", 0, 0),
+    ("brain", "AI Brain", 0, 20),
+    ("agents", "Multi-Agent System", 20, 40),
+    ("knowledge", "Knowledge Graph", 40, 60),
+    ("engine", None, 60, 80),
+    ("output", "Output Generator", 80, 100),
+)
 
 
 def get_pipeline_status(project_id: str, user_id: str) -> Optional[PipelineStatus]:
     """Get real-time pipeline status for a project."""
     projects = _load_projects()
-    project_data = projects.get(project_id)
+    project = projects.get(project_id)
     
-    if not project_data or project_data.get("user_id") != user_id:
+    if not project or project.user_id != user_id:
         return None
     
-    stage = PipelineStage(project_data.get("pipeline_stage", "idle"))
-    progress = project_data.get("progress", 0.0)
+    stage = PipelineStage(project.pipeline_stage)
+    progress = project.progress
     
-    # Define pipeline nodes
+    engine_name = "Research Engine" if project.project_type == "research" else "Patent Engine"
     nodes = [
         PipelineNode(
-            id="input",
-            name="User Input",
-            status="complete" if progress > 0 else "idle"
-        ),
-        PipelineNode(
-            id="brain",
-            name="AI Brain",
-            status="complete" if progress >= 20 else ("active" if progress > 0 else "idle"),
-            progress=min(100, progress * 5) if progress < 20 else 100
-        ),
-        PipelineNode(
-            id="agents",
-            name="Multi-Agent System",
-            status="complete" if progress >= 40 else ("active" if progress >= 20 else "idle"),
-            progress=max(0, min(100, (progress - 20) * 5)) if 20 <= progress < 40 else (100 if progress >= 40 else 0)
-        ),
-        PipelineNode(
-            id="knowledge",
-            name="Knowledge Graph",
-            status="complete" if progress >= 60 else ("active" if progress >= 40 else "idle"),
-            progress=max(0, min(100, (progress - 40) * 5)) if 40 <= progress < 60 else (100 if progress >= 60 else 0)
-        ),
-        PipelineNode(
-            id="engine",
-            name="Research Engine" if project_data.get("project_type") == "research" else "Patent Engine",
-            status="complete" if progress >= 80 else ("active" if progress >= 60 else "idle"),
-            progress=max(0, min(100, (progress - 60) * 5)) if 60 <= progress < 80 else (100 if progress >= 80 else 0)
-        ),
-        PipelineNode(
-            id="output",
-            name="Output Generator",
-            status="complete" if progress >= 100 else ("active" if progress >= 80 else "idle"),
-            progress=max(0, min(100, (progress - 80) * 5)) if 80 <= progress < 100 else (100 if progress >= 100 else 0)
-        ),
+            id=node_id,
+            name=name or engine_name,
+            status=(
+                "complete" if progress >= hi
+                else "active" if progress >= lo
+                else "idle"
+            ) if progress > 0 else "idle",
+            progress=max(0.0, min(100.0, (progress - lo) * 5)) if hi > lo else 0.0,
+        )
+        for node_id, name, lo, hi in _PIPELINE_NODES
     ]
     
     return PipelineStatus(
@@ -366,150 +513,139 @@ def get_pipeline_status(project_id: str, user_id: str) -> Optional[PipelineStatu
 
 # ==================== Roadmap Functions ====================
 
+_PATENT_PHASES = (
+    ("Discovery", "Initial research and prior art analysis", "#6366f1", (
+        ("Define core invention", "Clearly articulate the novel aspects"),
+        ("Prior art search", "Conduct comprehensive prior art analysis"),
+        ("Novelty assessment", "Evaluate novelty indicators"),
+    )),
+    ("Documentation", "Prepare patent application materials", "#8b5cf6", (
+        ("Draft claims", "Write patent claims"),
+        ("Technical drawings", "Prepare technical illustrations"),
+        ("Description write-up", "Complete detailed description"),
+    )),
+    ("Filing", "Submit and track application", "#a855f7", (
+        ("Legal review", "Attorney review and feedback"),
+        ("File application", "Submit to patent office"),
+        ("Track prosecution", "Monitor and respond to office actions"),
+    )),
+)
+
+_RESEARCH_PHASES = (
+    ("Literature Review", "Comprehensive research landscape analysis", "#06b6d4", (
+        ("Define research questions", "Establish clear research objectives"),
+        ("Literature search", "Systematic literature review"),
+        ("Gap analysis", "Identify research gaps"),
+    )),
+    ("Methodology", "Design and validate research approach", "#14b8a6", (
+        ("Design methodology", "Create research methodology"),
+        ("Data collection plan", "Define data sources and methods"),
+        ("Validation strategy", "Plan validation approach"),
+    )),
+    ("Publication", "Prepare and submit for publication", "#10b981", (
+        ("Draft paper", "Write research paper"),
+        ("Peer review prep", "Internal review and refinement"),
+        ("Submit to venue", "Submit to conference or journal"),
+    )),
+)
+
+
 def _create_default_roadmap(project_id: str, project_type: ProjectType) -> Roadmap:
     """Create default roadmap based on project type."""
-    roadmaps = _load_roadmaps()
-    
-    if project_type == ProjectType.PATENT:
-        phases = [
-            RoadmapPhase(
-                id=str(uuid.uuid4()),
-                name="Discovery",
-                description="Initial research and prior art analysis",
-                color="#6366f1",
-                milestones=[
-                    RoadmapMilestone(id=str(uuid.uuid4()), title="Define core invention", description="Clearly articulate the novel aspects", order=0),
-                    RoadmapMilestone(id=str(uuid.uuid4()), title="Prior art search", description="Conduct comprehensive prior art analysis", order=1),
-                    RoadmapMilestone(id=str(uuid.uuid4()), title="Novelty assessment", description="Evaluate novelty indicators", order=2),
-                ]
-            ),
-            RoadmapPhase(
-                id=str(uuid.uuid4()),
-                name="Documentation",
-                description="Prepare patent application materials",
-                color="#8b5cf6",
-                milestones=[
-                    RoadmapMilestone(id=str(uuid.uuid4()), title="Draft claims", description="Write patent claims", order=0),
-                    RoadmapMilestone(id=str(uuid.uuid4()), title="Technical drawings", description="Prepare technical illustrations", order=1),
-                    RoadmapMilestone(id=str(uuid.uuid4()), title="Description write-up", description="Complete detailed description", order=2),
-                ]
-            ),
-            RoadmapPhase(
-                id=str(uuid.uuid4()),
-                name="Filing",
-                description="Submit and track application",
-                color="#a855f7",
-                milestones=[
-                    RoadmapMilestone(id=str(uuid.uuid4()), title="Legal review", description="Attorney review and feedback", order=0),
-                    RoadmapMilestone(id=str(uuid.uuid4()), title="File application", description="Submit to patent office", order=1),
-                    RoadmapMilestone(id=str(uuid.uuid4()), title="Track prosecution", description="Monitor and respond to office actions", order=2),
-                ]
-            ),
-        ]
-    else:
-        phases = [
-            RoadmapPhase(
-                id=str(uuid.uuid4()),
-                name="Literature Review",
-                description="Comprehensive research landscape analysis",
-                color="#06b6d4",
-                milestones=[
-                    RoadmapMilestone(id=str(uuid.uuid4()), title="Define research questions", description="Establish clear research objectives", order=0),
-                    RoadmapMilestone(id=str(uuid.uuid4()), title="Literature search", description="Systematic literature review", order=1),
-                    RoadmapMilestone(id=str(uuid.uuid4()), title="Gap analysis", description="Identify research gaps", order=2),
-                ]
-            ),
-            RoadmapPhase(
-                id=str(uuid.uuid4()),
-                name="Methodology",
-                description="Design and validate research approach",
-                color="#14b8a6",
-                milestones=[
-                    RoadmapMilestone(id=str(uuid.uuid4()), title="Design methodology", description="Create research methodology", order=0),
-                    RoadmapMilestone(id=str(uuid.uuid4()), title="Data collection plan", description="Define data sources and methods", order=1),
-                    RoadmapMilestone(id=str(uuid.uuid4()), title="Validation strategy", description="Plan validation approach", order=2),
-                ]
-            ),
-            RoadmapPhase(
-                id=str(uuid.uuid4()),
-                name="Publication",
-                description="Prepare and submit for publication",
-                color="#10b981",
-                milestones=[
-                    RoadmapMilestone(id=str(uuid.uuid4()), title="Draft paper", description="Write research paper", order=0),
-                    RoadmapMilestone(id=str(uuid.uuid4()), title="Peer review prep", description="Internal review and refinement", order=1),
-                    RoadmapMilestone(id=str(uuid.uuid4()), title="Submit to venue", description="Submit to conference or journal", order=2),
-                ]
-            ),
-        ]
-    
+    # The phase/milestone text is static - stamp fresh IDs onto the
+    # module-level template instead of rebuilding the literals per call.
+    # All ids come from one urandom read rather than a uuid4() syscall
+    # each; they are opaque handles, so plain 32-char hex is fine.
+    template = _PATENT_PHASES if project_type == ProjectType.PATENT else _RESEARCH_PHASES
+    id_count = len(template) + sum(len(ms) for _, _, _, ms in template)
+    raw = os.urandom(16 * id_count)
+    ids = iter(raw[i:i + 16].hex() for i in range(0, len(raw), 16))
+    phases = [
+        RoadmapPhase(
+            id=next(ids),
+            name=name,
+            description=description,
+            color=color,
+            milestones=[
+                RoadmapMilestone(id=next(ids), title=title, description=desc, order=order)
+                for order, (title, desc) in enumerate(milestones)
+            ]
+        )
+        for name, description, color, milestones in template
+    ]
+
+    now = datetime.utcnow()
     roadmap = Roadmap(
         project_id=project_id,
         phases=phases,
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow()
+        created_at=now,
+        updated_at=now
     )
     
-    roadmaps[project_id] = roadmap.model_dump()
-    _save_roadmaps(roadmaps)
+    _save_roadmap_record(project_id, roadmap.model_dump())
     
     return roadmap
 
 
-def get_roadmap(project_id: str, user_id: str) -> Optional[Roadmap]:
+async def get_roadmap(project_id: str, user_id: str) -> Optional[Roadmap]:
     """Get roadmap for a project."""
-    # First verify user owns the project
-    projects = _load_projects()
-    project_data = projects.get(project_id)
-    
-    if not project_data or project_data.get("user_id") != user_id:
+    # The project and roadmap stores are independent files - load them
+    # concurrently in worker threads instead of two serial blocking reads.
+    projects, roadmaps = await asyncio.gather(
+        asyncio.to_thread(_load_projects),
+        asyncio.to_thread(_load_roadmaps),
+    )
+    project = projects.get(project_id)
+
+    if not project or project.user_id != user_id:
         return None
-    
-    roadmaps = _load_roadmaps()
+
     roadmap_data = roadmaps.get(project_id)
-    
+
     if roadmap_data:
         return Roadmap(**roadmap_data)
     
     # Create default if doesn't exist
-    return _create_default_roadmap(project_id, ProjectType(project_data["project_type"]))
+    return _create_default_roadmap(project_id, ProjectType(project.project_type))
 
 
-def update_milestone(
-    project_id: str, 
-    user_id: str, 
-    phase_id: str, 
-    milestone_id: str, 
+async def update_milestone(
+    project_id: str,
+    user_id: str,
+    phase_id: str,
+    milestone_id: str,
     completed: bool
 ) -> Optional[Roadmap]:
     """Update a milestone's completion status."""
-    # Verify ownership
-    projects = _load_projects()
-    project_data = projects.get(project_id)
-    
-    if not project_data or project_data.get("user_id") != user_id:
+    # Ownership check and roadmap fetch read independent files - load
+    # them concurrently in worker threads.
+    projects, roadmaps = await asyncio.gather(
+        asyncio.to_thread(_load_projects),
+        asyncio.to_thread(_load_roadmaps),
+    )
+    project = projects.get(project_id)
+
+    if not project or project.user_id != user_id:
         return None
-    
-    roadmaps = _load_roadmaps()
+
     roadmap_data = roadmaps.get(project_id)
-    
+
     if not roadmap_data:
         return None
-    
-    # Find and update milestone
-    for phase in roadmap_data.get("phases", []):
-        if phase["id"] == phase_id:
-            for milestone in phase.get("milestones", []):
-                if milestone["id"] == milestone_id:
-                    milestone["completed"] = completed
-                    if completed:
-                        milestone["completed_at"] = datetime.utcnow().isoformat()
-                    else:
-                        milestone["completed_at"] = None
-                    break
-    
-    roadmap_data["updated_at"] = datetime.utcnow().isoformat()
-    roadmaps[project_id] = roadmap_data
-    _save_roadmaps(roadmaps)
+
+    # Locate the milestone through the position index - O(1) instead of
+    # scanning every phase and milestone.
+    now_iso = datetime.utcnow().isoformat()
+    phase_index = _get_milestone_index().get(project_id, {})
+    if phase_id in phase_index:
+        phase_idx, milestone_index = phase_index[phase_id]
+        milestone_idx = milestone_index.get(milestone_id)
+        if milestone_idx is not None:
+            milestone = roadmap_data["phases"][phase_idx]["milestones"][milestone_idx]
+            milestone["completed"] = completed
+            milestone["completed_at"] = now_iso if completed else None
+
+    roadmap_data["updated_at"] = now_iso
+    _save_roadmap_record(project_id, roadmap_data)
     
     return Roadmap(**roadmap_data)
@@ -5,9 +5,11 @@ Auto-generates structured summaries with evidence-grounded analysis.
 Separates existing work, user contribution, and uncertainty.
 """
 
-from typing import List, Dict, Optional
 from dataclasses import dataclass
 from enum import Enum
+from typing import List, Dict, Optional
+
+from app.core.text import count_words
 
 
 class SummarySection(str, Enum):
@@ -18,7 +20,7 @@ class SummarySection(str, Enum):
     UNCERTAINTY = "uncertainty"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class StructuredSummary:
     """A structured, evidence-grounded summary."""
     success: bool
@@ -37,10 +39,58 @@ class StructuredSummary:
     confidence_level: str  # low/medium/high
     
     # Metadata
-    word_count: int
     is_complete: bool
     error_message: Optional[str] = None
 
+    @property
+    def word_count(self) -> int:
+        """Words across the narrative sections, computed on access."""
+        return (
+            count_words(self.existing_work)
+            + count_words(self.user_contribution)
+            + count_words(self.differentiation)
+        )
+
+
+# Static prompt skeleton for generate_summary: instructions and schema
+# first so the variable user content sits at the tail of the prompt.
+_SUMMARY_PROMPT_TEMPLATE = """Generate a structured summary for this {type_label}.
+
+Respond in JSON with this exact structure:
+{{
+    "existing_work": "2-3 paragraphs summarizing what already exists in the field. Be specific about related prior art and current state of knowledge.",
+    
+    "user_contribution": "2-3 paragraphs explaining what this {type_label} contributes. Focus on the novel aspects and specific innovations.",
+    
+    "differentiation": "1-2 paragraphs explaining WHERE the contribution lies relative to similar work. What gap does it fill? What problem does it solve differently?",
+    
+    "uncertainty": "1 paragraph noting areas where evidence is insufficient or claims are uncertain. Be honest about limitations.",
+    
+    "key_innovations": ["Innovation 1", "Innovation 2", "Innovation 3"],
+    
+    "prior_art_context": ["Related work 1", "Related work 2"],
+    
+    "evidence_citations": ["Specific text or claim from the document that supports each innovation"],
+    
+    "confidence_level": "low" | "medium" | "high"
+}}
+
+CRITICAL RULES:
+1. Do NOT fabricate claims or invent results
+2. Only include assertions that can be traced to the provided text
+3. Clearly separate facts from interpretations
+4. If something is uncertain, say so explicitly
+5. Use hedging language appropriately ("appears to", "suggests", "may")
+6. This summary is ASSISTIVE, not authoritative
+
+=== USER INPUT ===
+TITLE: {user_title}
+
+CONTENT:
+{user_text}
+{context_hint}
+{concepts_hint}"""
+
 
 class ResearchSummarizer:
     """
@@ -58,7 +108,10 @@ class ResearchSummarizer:
     """
 
     def __init__(self):
-        self.slm_engine = None
+        # Shared module singleton - constructing engines per call would
+        # redo config/client setup on every request.
+        from app.services.slm_engine import slm_engine
+        self.slm_engine = slm_engine
 
     async def generate_summary(
         self,
@@ -85,10 +138,9 @@ class ResearchSummarizer:
             return self._create_error_summary("No text provided for summarization")
 
         try:
-            from app.services.slm_engine import SLMEngine, SLMRequest
-            
-            engine = SLMEngine()
-            
+            from app.services.slm_engine import SLMRequest, truncate_for_prompt
+            from app.services.slm_cache import cached_generate, make_cache_key
+
             type_label = "patent application" if project_type == "patent" else "research proposal"
             
             context_hint = ""
@@ -99,58 +151,29 @@ class ResearchSummarizer:
             if key_concepts:
                 concepts_hint = f"\n\nKey concepts: {', '.join(key_concepts[:15])}"
 
-            prompt = f"""Generate a structured summary for this {type_label}.
-
-TITLE: {user_title}
-
-CONTENT:
-{user_text[:4000]}
-{context_hint}
-{concepts_hint}
-
-Respond in JSON with this exact structure:
-{{
-    "existing_work": "2-3 paragraphs summarizing what already exists in the field. Be specific about related prior art and current state of knowledge.",
-    
-    "user_contribution": "2-3 paragraphs explaining what this {type_label} contributes. Focus on the novel aspects and specific innovations.",
-    
-    "differentiation": "1-2 paragraphs explaining WHERE the contribution lies relative to similar work. What gap does it fill? What problem does it solve differently?",
-    
-    "uncertainty": "1 paragraph noting areas where evidence is insufficient or claims are uncertain. Be honest about limitations.",
-    
-    "key_innovations": ["Innovation 1", "Innovation 2", "Innovation 3"],
-    
-    "prior_art_context": ["Related work 1", "Related work 2"],
-    
-    "evidence_citations": ["Specific text or claim from the document that supports each innovation"],
-    
-    "confidence_level": "low" | "medium" | "high"
-}}
-
-CRITICAL RULES:
-1. Do NOT fabricate claims or invent results
-2. Only include assertions that can be traced to the provided text
-3. Clearly separate facts from interpretations
-4. If something is uncertain, say so explicitly
-5. Use hedging language appropriately ("appears to", "suggests", "may")
-6. This summary is ASSISTIVE, not authoritative"""
+            prompt = _SUMMARY_PROMPT_TEMPLATE.format(
+                type_label=type_label,
+                user_title=user_title,
+                user_text=truncate_for_prompt(user_text, 4000),
+                context_hint=context_hint,
+                concepts_hint=concepts_hint,
+            )
 
-            result = await engine.generate(SLMRequest(
+            # Content-addressed cache: identical summary requests (same
+            # text, title, type and hints) short-circuit the LLM call.
+            result = await cached_generate(SLMRequest(
                 prompt=prompt,
                 system_prompt="You are ANTIGRAVITY, generating evidence-grounded research summaries. Never fabricate. Always hedge appropriately. Separate facts from interpretations.",
                 response_format="json"
+            ), key=make_cache_key(
+                "generate_summary", user_title, user_text, project_type,
+                context_hint, concepts_hint
             ))
 
             if not result.success or not result.parsed_json:
                 return self._create_error_summary("Summary generation could not be completed")
 
             parsed = result.parsed_json
-            
-            full_text = (
-                parsed.get("existing_work", "") + 
-                parsed.get("user_contribution", "") + 
-                parsed.get("differentiation", "")
-            )
 
             return StructuredSummary(
                 success=True,
@@ -163,7 +186,6 @@ CRITICAL RULES:
                 prior_art_context=parsed.get("prior_art_context", []),
                 evidence_citations=parsed.get("evidence_citations", []),
                 confidence_level=parsed.get("confidence_level", "medium"),
-                word_count=len(full_text.split()),
                 is_complete=True
             )
 
@@ -185,10 +207,8 @@ CRITICAL RULES:
                 "error": "No works provided for comparison"
             }
 
-        from app.services.slm_engine import SLMEngine, SLMRequest
-        
-        engine = SLMEngine()
-        
+        from app.services.slm_engine import SLMRequest
+
         works_text = "\n\n".join([
             f"PRIOR WORK: {w['title']}\n{w.get('summary', 'No summary available')}"
             for w in compared_works[:3]
@@ -219,7 +239,7 @@ Respond in JSON:
     "recommendation": "What the user should emphasize to differentiate"
 }}"""
 
-        result = await engine.generate(SLMRequest(
+        result = await self.slm_engine.generate(SLMRequest(
             prompt=prompt,
             system_prompt="You are ANTIGRAVITY, performing comparative analysis. Be evidence-based and specific.",
             response_format="json"
@@ -249,7 +269,6 @@ Respond in JSON:
             prior_art_context=[],
             evidence_citations=[],
             confidence_level="low",
-            word_count=0,
             is_complete=False,
             error_message=error_msg
         )
@@ -0,0 +1,244 @@
+"""
+Inventix AI - SLM Response Cache
+================================
+LRU + TTL cache in front of the SLM engine.
+
+Identical prompts within the TTL window skip the LLM entirely.
+Concurrent identical requests are coalesced so only one call is
+in flight per cache key.
+"""
+
+import asyncio
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional
+
+import orjson
+from cachetools import TTLCache
+
+from app.config import settings
+from app.services.slm_engine import SLMRequest, SLMResponse, slm_engine
+
+# Namespace prefix for persisted keys; bump the version to invalidate
+# the on-disk tier wholesale after prompt-template changes.
+_KEY_NAMESPACE = "slm:v1:"
+
+_L2_PATH = Path(__file__).parent.parent.parent / "data" / "slm_cache.db"
+
+# Whitespace run, collapsed to a single space during key normalization
+_WS_RE = re.compile(r"\s+")
+
+
+class _SqliteCacheTier:
+    """
+    Persistent second cache tier behind the in-memory TTLCache.
+
+    Successful responses are written through to a small SQLite table
+    (zlib-compressed orjson payloads) so restarts and multiple workers
+    don't re-pay for Gemini calls the process has already made. All
+    failures are swallowed - the disk tier is an optimization, never a
+    dependency.
+    """
+
+    def __init__(self, path: Path = _L2_PATH, ttl: Optional[float] = None):
+        self._path = path
+        self._ttl = ttl if ttl is not None else settings.slm_cache_l2_ttl_days * 86400.0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self._path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS slm_cache ("
+                "key TEXT PRIMARY KEY, payload BLOB, expires_at REAL)"
+            )
+            # Opportunistic cleanup of entries that expired while down
+            self._conn.execute(
+                "DELETE FROM slm_cache WHERE expires_at < ?", (time.time(),)
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> Optional[SLMResponse]:
+        """Return the persisted response for `key`, or None."""
+        try:
+            with self._lock:
+                row = self._db().execute(
+                    "SELECT payload FROM slm_cache WHERE key = ? AND expires_at > ?",
+                    (_KEY_NAMESPACE + key, time.time())
+                ).fetchone()
+            if row is None:
+                return None
+            data = orjson.loads(zlib.decompress(row[0]))
+            return SLMResponse(
+                success=True,
+                raw_text=data["raw_text"],
+                parsed_json=data["parsed_json"],
+                error=None,
+                model_used=data["model_used"],
+            )
+        except Exception:
+            return None
+
+    def put(self, key: str, response: SLMResponse):
+        """Persist a successful response under `key`."""
+        if not response.success:
+            return
+        try:
+            payload = zlib.compress(orjson.dumps({
+                "raw_text": response.raw_text,
+                "parsed_json": response.parsed_json,
+                "model_used": response.model_used,
+            }))
+            with self._lock:
+                conn = self._db()
+                conn.execute(
+                    "INSERT OR REPLACE INTO slm_cache (key, payload, expires_at) "
+                    "VALUES (?, ?, ?)",
+                    (_KEY_NAMESPACE + key, payload, time.time() + self._ttl)
+                )
+                conn.commit()
+        except Exception:
+            pass
+
+
+def make_cache_key(*parts: Optional[str]) -> str:
+    """
+    Build a stable cache key from normalized prompt inputs.
+
+    Each part is lowercased and has whitespace runs collapsed to single
+    spaces before hashing, so trivially different submissions (casing,
+    indentation, stray newlines) still hit the cache.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        normalized = _WS_RE.sub(" ", (part or "").strip().lower())
+        digest.update(normalized.encode("utf-8"))
+        digest.update(b"|")
+    return digest.hexdigest()
+
+
+class SLMResponseCache:
+    """
+    TTL-bounded LRU cache for SLM responses with request coalescing.
+
+    Only successful responses are cached; failures always pass through
+    so the caller's retry/crash-log handling stays intact.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 3600.0):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._l2 = _SqliteCacheTier()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        # Monotonic counters for observability; coalesced waiters count
+        # as hits since they don't trigger an engine call of their own.
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[SLMResponse]:
+        """Return a cached response, or None on miss/expiry."""
+        return self._cache.get(key)
+
+    def put(self, key: str, response: SLMResponse):
+        """Cache a successful response."""
+        if response.success:
+            self._cache[key] = response
+
+    async def get_or_generate(
+        self,
+        key: str,
+        request: SLMRequest,
+        generate: Optional[Callable[[SLMRequest], Awaitable[SLMResponse]]] = None
+    ) -> SLMResponse:
+        """
+        Return the cached response for `key`, generating on miss.
+
+        Concurrent callers with the same key share a single in-flight
+        generation instead of issuing duplicate LLM calls.
+        """
+        cached = self._cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            self.hits += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            # L2 lookup runs on a worker thread (SQLite blocks) and is
+            # covered by the in-flight future so concurrent duplicates
+            # wait for one disk read, not many.
+            response = await asyncio.to_thread(self._l2.get, key)
+            if response is not None:
+                self.hits += 1
+                self._cache[key] = response
+                future.set_result(response)
+                return response
+
+            self.misses += 1
+            response = await (generate or slm_engine.generate)(request)
+            self.put(key, response)
+            if response.success:
+                await asyncio.to_thread(self._l2.put, key, response)
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            # Resolve the future on ANY exit - including cancellation
+            # (client disconnect cancels the endpoint task) - so
+            # coalesced waiters shielded on it fail fast instead of
+            # hanging on a forever-pending future.
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Mark the exception retrieved: with no waiters
+                # attached, GC would otherwise log "Future exception
+                # was never retrieved".
+                future.exception()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+
+# Singleton instance
+slm_cache = SLMResponseCache()
+
+
+async def cached_generate(
+    request: SLMRequest,
+    key: Optional[str] = None,
+    generate: Optional[Callable[[SLMRequest], Awaitable[SLMResponse]]] = None,
+    no_cache: bool = False
+) -> SLMResponse:
+    """
+    Generate through the shared cache.
+
+    The key defaults to a digest of the full request - prompt inputs
+    plus model and sampling knobs, so changing temperature or the
+    configured model never serves a stale entry. Callers with
+    cheaper-to-hash source fields (e.g. idea text + domain) can pass a
+    precomputed key instead. `no_cache=True` bypasses the lookup but
+    still stores the fresh result for subsequent callers.
+    """
+    if key is None:
+        key = make_cache_key(
+            request.prompt, request.system_prompt, request.response_format,
+            settings.gemini_model, str(request.temperature), str(request.max_tokens),
+            str(request.response_schema)
+        )
+    if no_cache:
+        response = await (generate or slm_engine.generate)(request)
+        slm_cache.put(key, response)
+        return response
+    return await slm_cache.get_or_generate(key, request, generate)
@@ -10,26 +10,35 @@ This engine:
 - Returns CRASH logs on failure
 """
 
-import json
-import google.generativeai as genai
-from pydantic import BaseModel, Field
-from typing import Optional, Any
+import asyncio
+import re
+import time
+from functools import lru_cache
+
+import orjson
+from typing import Optional
 from dataclasses import dataclass
 
 from app.config import settings
 
 
-# Configure Gemini
-genai.configure(api_key=settings.gemini_api_key)
-
+@dataclass(slots=True, frozen=True)
+class SLMRequest:
+    """
+    Request to the SLM engine.
 
-class SLMRequest(BaseModel):
-    """Request to the SLM engine."""
+    A slotted dataclass rather than a pydantic model: requests are
+    built programmatically (never from external input), so per-call
+    validation buys nothing and dataclass construction is much cheaper.
+    """
     prompt: str
     system_prompt: Optional[str] = None
     response_format: str = "json"  # "json" or "text"
     max_tokens: int = 2048
     temperature: float = 0.3  # Lower for more deterministic outputs
+    # Optional OpenAPI-style schema for server-side constrained decoding
+    # in JSON mode; None leaves the output shape to the prompt.
+    response_schema: Optional[dict] = None
 
 
 @dataclass
@@ -42,6 +51,169 @@ class SLMResponse:
     model_used: str
     
 
+def truncate_for_prompt(text: str, limit: int) -> str:
+    """
+    Truncate text for prompt inclusion at a word boundary.
+
+    Slicing mid-word wastes prompt budget on a broken token and forces
+    a copy even when the text already fits; this only copies when
+    truncating and backs up to the last whitespace so the excerpt ends
+    on a whole word.
+    """
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(' ', 0, limit)
+    return text[:cut if cut > 0 else limit]
+
+
+# Optional leading/trailing markdown fence around model output; one
+# compiled pattern replaces the old startswith/endswith/strip chain of
+# separate passes over the buffer.
+_FENCE_RE = re.compile(r"\s*(?:```(?:json)?)?(.*?)(?:```\s*)?$", re.DOTALL)
+
+
+def strip_code_fences(text: str) -> str:
+    """Remove a surrounding markdown code fence from model output."""
+    return _FENCE_RE.match(text).group(1).strip()
+
+
+# Bracketed evidence citation, e.g. [EVD-3]. One compiled findall pass
+# extracts every cited id for the client-side grounding check.
+_EVID_RE = re.compile(r"\[([A-Z]+-\d+)\]")
+
+
+# Static preamble for evidence-locked generation. Kept as one module
+# constant so every call sends the same bytes up front - the variable
+# evidence and task are appended after it.
+_EVIDENCE_PROMPT_PREFIX = """RULES:
+- Every factual statement MUST reference an evidence ID in brackets, e.g. [EVD-1]
+- If evidence is insufficient, state "UNKNOWN"
+- Do NOT invent facts beyond provided evidence
+
+---
+
+EVIDENCE (You may ONLY reference these):
+"""
+
+_EVIDENCE_DEFAULT_SYSTEM = """You are ANTIGRAVITY, an evidence-locked intelligence system.
+You ONLY reason over provided evidence.
+Every statement MUST reference an evidence ID.
+If evidence is insufficient, return UNKNOWN.
+Output valid JSON only."""
+
+
+# Safety settings are identical for every model instance; one shared
+# immutable tuple instead of rebuilding the list of dicts.
+_SAFETY_SETTINGS = (
+    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
+)
+
+
+@lru_cache(maxsize=32)
+def _generation_config(temperature: float, max_tokens: int, json_mode: bool) -> dict:
+    """
+    Memoized per-call generation config.
+
+    The request's sampling knobs were previously ignored because the
+    config was baked into the model at construction; passing it per
+    call honors them, and the lru_cache means the handful of distinct
+    (temperature, max_tokens) combinations cost one dict each.
+    """
+    config = {
+        "temperature": temperature,
+        "top_p": 0.95,
+        "top_k": 40,
+        "max_output_tokens": max_tokens,
+    }
+    if json_mode:
+        config["response_mime_type"] = "application/json"
+    return config
+
+
+class _TokenBucket:
+    """
+    Minimal async token bucket, sized in requests per minute.
+
+    Issuing calls just under the API quota is cheaper than tripping it:
+    a 429 costs the failed round trip plus exponential backoff, all
+    pure wall-clock latency. Excess callers queue (FIFO behind the
+    lock) rather than being dropped.
+    """
+
+    def __init__(self, rate_per_minute: int):
+        self._capacity = float(rate_per_minute)
+        self._tokens = float(rate_per_minute)
+        self._fill_rate = rate_per_minute / 60.0
+        self._updated = time.monotonic()
+        self._lock = None  # created lazily inside the running loop
+
+    async def acquire(self):
+        """Block until a request token is available, then consume it."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._capacity,
+                self._tokens + (now - self._updated) * self._fill_rate
+            )
+            self._updated = now
+            if self._tokens < 1.0:
+                await asyncio.sleep((1.0 - self._tokens) / self._fill_rate)
+                self._updated = time.monotonic()
+                self._tokens = 1.0
+            self._tokens -= 1.0
+
+
+class _JsonStreamValidator:
+    """
+    Incremental structural check for streamed JSON output.
+
+    Tracks string/escape state and bracket depth in one O(n) pass as
+    chunks arrive, so a generation that has already gone structurally
+    wrong (prose preamble, unbalanced brackets) is abandoned mid-stream
+    instead of after the full max_tokens output has been paid for.
+    """
+
+    __slots__ = ("_depth", "_in_string", "_escape", "_started")
+
+    def __init__(self):
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._started = False
+
+    def feed(self, text: str):
+        """Consume a chunk, raising ValueError on structural failure."""
+        for ch in text:
+            if self._escape:
+                self._escape = False
+                continue
+            if self._in_string:
+                if ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if not self._started:
+                if ch.isspace():
+                    continue
+                if ch not in "{[":
+                    raise ValueError(f"response is not JSON (starts with {ch!r})")
+                self._started = True
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth < 0:
+                    raise ValueError("unbalanced brackets in streamed JSON response")
+
+
 class SLMEngine:
     """
     Small Language Model Engine using Google Gemini.
@@ -54,22 +226,33 @@ class SLMEngine:
     """
     
     def __init__(self):
-        self.model = genai.GenerativeModel(
-            model_name=settings.gemini_model,
-            generation_config={
-                "temperature": 0.3,
-                "top_p": 0.95,
-                "top_k": 40,
-                "max_output_tokens": 2048,
-            },
-            safety_settings=[
-                {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
-                {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
-                {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
-                {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
-            ]
-        )
-        
+        # The Gemini SDK is slow to import; defer it (and the API
+        # configuration) to first use so workers that only serve
+        # status/health traffic boot without paying for it.
+        self._model = None
+        # Caps concurrent in-flight requests when callers fan out with
+        # gather/generate_batch; created lazily so it binds to the
+        # running loop. Size comes from settings.slm_max_parallel.
+        self._semaphore = None
+        # Smooths the issue rate under the API quota so fan-outs never
+        # pay the 429 retry backoff.
+        self._rate = _TokenBucket(settings.slm_requests_per_minute)
+
+    @property
+    def model(self):
+        """The configured GenerativeModel, created lazily on first use."""
+        if self._model is None:
+            import google.generativeai as genai
+
+            genai.configure(api_key=settings.gemini_api_key)
+            # Generation config travels with each call (see
+            # _generation_config) so per-request knobs are honored.
+            self._model = genai.GenerativeModel(
+                model_name=settings.gemini_model,
+                safety_settings=list(_SAFETY_SETTINGS)
+            )
+        return self._model
+
     async def generate(self, request: SLMRequest) -> SLMResponse:
         """
         Generate a response from the SLM.
@@ -77,40 +260,85 @@ class SLMEngine:
         Returns structured SLMResponse with success/failure status.
         Includes retry logic for rate limiting (429) errors.
         """
-        import asyncio
-        
         max_retries = 3
         retry_delay = 2  # seconds
         
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(settings.slm_max_parallel)
+
         for attempt in range(max_retries):
             try:
-                # Build the full prompt
-                full_prompt = ""
-                if request.system_prompt:
-                    full_prompt = f"{request.system_prompt}\n\n---\n\n"
-                full_prompt += request.prompt
-                
-                # Generate response
-                response = self.model.generate_content(full_prompt)
+                # Build the full prompt in one allocation
+                full_prompt = (
+                    f"{request.system_prompt}\n\n---\n\n{request.prompt}"
+                    if request.system_prompt else request.prompt
+                )
                 
-                # Extract text
-                raw_text = response.text.strip()
+                # JSON mode is enforced server-side: the API emits
+                # syntactically valid JSON, so fenced or truncated
+                # payloads (and their retry round trips) disappear.
+                generation_config = _generation_config(
+                    request.temperature,
+                    request.max_tokens,
+                    request.response_format == "json"
+                )
+                if request.response_schema is not None:
+                    # Copy so the schema never leaks into the memoized dict
+                    generation_config = {
+                        **generation_config,
+                        "response_schema": request.response_schema,
+                    }
+
+                # The SDK's native async call keeps the event loop free
+                # for the duration of the network round trip - no worker
+                # thread needed; the semaphore bounds the fan-out.
+                async with self._semaphore:
+                    # Consume a rate token only once a concurrency slot
+                    # is held, right before the call is issued.
+                    await self._rate.acquire()
+                    if request.response_format == "json":
+                        # Stream JSON responses through the incremental
+                        # validator so malformed output aborts early
+                        # instead of paying for the full generation.
+                        response = await self.model.generate_content_async(
+                            full_prompt,
+                            generation_config=generation_config,
+                            stream=True
+                        )
+                        validator = _JsonStreamValidator()
+                        parts = []
+                        async for chunk in response:
+                            try:
+                                text = chunk.text
+                            except ValueError:
+                                # Chunks without text parts (e.g. safety
+                                # metadata)
+                                continue
+                            if text:
+                                validator.feed(text)
+                                parts.append(text)
+                        raw_text = "".join(parts).strip()
+                    else:
+                        response = await self.model.generate_content_async(
+                            full_prompt, generation_config=generation_config
+                        )
+                        raw_text = response.text.strip()
                 
                 # Parse JSON if required
                 parsed_json = None
                 if request.response_format == "json":
                     try:
-                        # Handle markdown code blocks
-                        if raw_text.startswith("```json"):
-                            raw_text = raw_text[7:]
-                        if raw_text.startswith("```"):
-                            raw_text = raw_text[3:]
-                        if raw_text.endswith("```"):
-                            raw_text = raw_text[:-3]
-                        raw_text = raw_text.strip()
-                        
-                        parsed_json = json.loads(raw_text)
-                    except json.JSONDecodeError as e:
+                        # orjson decodes the nested graph/analysis
+                        # payloads several times faster than json.loads.
+                        # With the JSON mime type enforced the text
+                        # parses directly; fence stripping remains only
+                        # as a fallback safety net.
+                        try:
+                            parsed_json = orjson.loads(raw_text)
+                        except orjson.JSONDecodeError:
+                            raw_text = strip_code_fences(raw_text)
+                            parsed_json = orjson.loads(raw_text)
+                    except orjson.JSONDecodeError as e:
                         return SLMResponse(
                             success=False,
                             raw_text=raw_text,
@@ -151,6 +379,161 @@ class SLMEngine:
             model_used=settings.gemini_model
         )
     
+    async def generate_stream(self, request: SLMRequest):
+        """
+        Yield response text chunks as the model streams them.
+
+        The blocking SDK iterator is driven from a worker thread so the
+        event loop stays free between chunks. Callers are responsible
+        for reassembling and parsing the full text.
+        """
+        full_prompt = (
+            f"{request.system_prompt}\n\n---\n\n{request.prompt}"
+            if request.system_prompt else request.prompt
+        )
+
+        response = await asyncio.to_thread(
+            self.model.generate_content, full_prompt, stream=True,
+            generation_config=_generation_config(
+                request.temperature, request.max_tokens, False
+            )
+        )
+        iterator = iter(response)
+        while True:
+            chunk = await asyncio.to_thread(next, iterator, None)
+            if chunk is None:
+                break
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks without text parts (e.g. safety metadata)
+                continue
+            if text:
+                yield text
+
+    # Packing knobs for generate_batch: how many chars of task prompts
+    # fit in one packed call (~8K tokens) before starting another.
+    _BATCH_PROMPT_BUDGET = 24_000
+
+    _BATCH_INSTRUCTIONS = (
+        "Answer each task below independently.\n"
+        "Return ONLY a JSON array with exactly {n} elements, where element i "
+        "is the complete answer to Task i in the format that task requests."
+    )
+
+    async def _generate_packed(self, requests: list[SLMRequest]) -> Optional[list[SLMResponse]]:
+        """
+        Answer several JSON tasks with one engine call.
+
+        The prompts are packed into a numbered multi-task prompt and the
+        response is split positionally from the returned JSON array.
+        Returns None when the model doesn't produce a usable array, so
+        the caller can fall back to per-request generation.
+        """
+        tasks = "\n\n".join(
+            f"### Task {i + 1}:\n{r.prompt}" for i, r in enumerate(requests)
+        )
+        packed = SLMRequest(
+            prompt=self._BATCH_INSTRUCTIONS.format(n=len(requests)) + "\n\n" + tasks,
+            system_prompt=requests[0].system_prompt,
+            response_format="json",
+            max_tokens=max(r.max_tokens for r in requests),
+        )
+        response = await self.generate(packed)
+        parsed = response.parsed_json
+        if not response.success or not isinstance(parsed, list) or len(parsed) != len(requests):
+            return None
+        return [
+            SLMResponse(
+                success=True,
+                raw_text=orjson.dumps(element).decode(),
+                parsed_json=element if isinstance(element, dict) else None,
+                error=None,
+                model_used=response.model_used,
+            )
+            for element in parsed
+        ]
+
+    async def generate_batch(self, requests: list[SLMRequest]) -> list[SLMResponse]:
+        """
+        Execute a batch of requests, packing where possible.
+
+        JSON requests sharing a system prompt are coalesced into
+        multi-task calls (bounded by _BATCH_PROMPT_BUDGET) so N small
+        prompts cost one API round trip instead of N; everything else
+        runs as one concurrent gather pass. Responses are returned in
+        request order and a pack that fails to parse falls back to
+        per-request generation, so individual failures are reported
+        per-response, not raised.
+        """
+        results: list[Optional[SLMResponse]] = [None] * len(requests)
+
+        # Group packable work by (system_prompt, response_format)
+        groups: dict = {}
+        for idx, request in enumerate(requests):
+            groups.setdefault((request.system_prompt, request.response_format), []).append(idx)
+
+        singles: list[int] = []
+        packs: list[list[int]] = []
+        for (_, response_format), idxs in groups.items():
+            if response_format != "json" or len(idxs) < 2:
+                singles.extend(idxs)
+                continue
+            pack: list[int] = []
+            used = 0
+            for idx in idxs:
+                prompt_len = len(requests[idx].prompt)
+                if pack and used + prompt_len > self._BATCH_PROMPT_BUDGET:
+                    packs.append(pack)
+                    pack, used = [], 0
+                pack.append(idx)
+                used += prompt_len
+            packs.append(pack)
+
+        async def run_single(idx: int):
+            results[idx] = await self.generate(requests[idx])
+
+        async def run_pack(pack: list[int]):
+            if len(pack) == 1:
+                await run_single(pack[0])
+                return
+            pack_requests = [requests[idx] for idx in pack]
+            responses = await self._generate_packed(pack_requests)
+            if responses is None:
+                responses = await asyncio.gather(
+                    *(self.generate(r) for r in pack_requests)
+                )
+            for idx, response in zip(pack, responses):
+                results[idx] = response
+
+        await asyncio.gather(
+            *(run_pack(pack) for pack in packs),
+            *(run_single(idx) for idx in singles),
+        )
+        return results
+
+    # Constrained-decoding schema for evidence-locked output: every
+    # statement must carry the evidence ids it rests on, and `unknown`
+    # flags insufficient evidence explicitly.
+    _EVIDENCE_RESPONSE_SCHEMA = {
+        "type": "object",
+        "properties": {
+            "statements": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "text": {"type": "string"},
+                        "evidence_ids": {"type": "array", "items": {"type": "string"}},
+                    },
+                    "required": ["text", "evidence_ids"],
+                },
+            },
+            "unknown": {"type": "boolean"},
+        },
+        "required": ["statements", "unknown"],
+    }
+
     async def generate_with_evidence(
         self,
         prompt: str,
@@ -165,39 +548,62 @@ class SLMEngine:
         2. Forces evidence references in output
         3. Validates output references actual evidence IDs
         """
-        # Build evidence context
-        evidence_block = "\n".join([
-            f"[{e.get('id', f'EVD-{i}')}]: {e.get('content', '')}"
-            for i, e in enumerate(evidence)
-        ])
-        
-        full_prompt = f"""EVIDENCE (You may ONLY reference these):
-{evidence_block}
+        # Build evidence context. One pass produces both the prompt
+        # block and the cache-key parts, and the EVD-i fallback id is
+        # only formatted for items that actually lack an id instead of
+        # eagerly per item.
+        block_parts = []
+        key_parts = []
+        valid_ids = set()
+        for i, e in enumerate(evidence):
+            evidence_id = e["id"] if "id" in e else f"EVD-{i}"
+            content = e.get("content", "")
+            block_parts.append(f"[{evidence_id}]: {content}")
+            key_parts.append(f"{evidence_id}\x1f{content}")
+            valid_ids.add(evidence_id)
+        evidence_block = "\n".join(block_parts)
+
+        # Byte-identical static rules lead the prompt, then evidence,
+        # then the task: upstream prefix caching can reuse the shared
+        # preamble across calls since the variable content sits last.
+        full_prompt = _EVIDENCE_PROMPT_PREFIX + f"""{evidence_block}
 
 ---
 
 TASK:
 {prompt}
-
----
-
-RULES:
-- Every factual statement MUST reference an evidence ID in brackets, e.g. [EVD-1]
-- If evidence is insufficient, state "UNKNOWN"
-- Do NOT invent facts beyond provided evidence
 """
         
-        default_system = """You are ANTIGRAVITY, an evidence-locked intelligence system.
-You ONLY reason over provided evidence.
-Every statement MUST reference an evidence ID.
-If evidence is insufficient, return UNKNOWN.
-Output valid JSON only."""
-        
-        return await self.generate(SLMRequest(
+        # Cache under a canonical key: evidence entries are sorted so the
+        # same evidence set hits regardless of retrieval order, and each
+        # entry contributes its id and content so edited evidence under a
+        # reused id can never serve a stale answer.
+        from app.services.slm_cache import cached_generate, make_cache_key
+
+        cache_key = make_cache_key(
+            "generate_with_evidence", prompt, system_prompt,
+            *sorted(key_parts)
+        )
+        response = await cached_generate(SLMRequest(
             prompt=full_prompt,
-            system_prompt=system_prompt or default_system,
-            response_format="json"
-        ))
+            system_prompt=system_prompt or _EVIDENCE_DEFAULT_SYSTEM,
+            response_format="json",
+            response_schema=self._EVIDENCE_RESPONSE_SCHEMA
+        ), key=cache_key)
+
+        # Ground-truth the citations locally: a findall plus set diff
+        # catches hallucinated ids without a second verification call.
+        if response.success:
+            hallucinated = set(_EVID_RE.findall(response.raw_text)) - valid_ids
+            if hallucinated:
+                return SLMResponse(
+                    success=False,
+                    raw_text=response.raw_text,
+                    parsed_json=None,
+                    error=f"Hallucinated evidence IDs: {sorted(hallucinated)}",
+                    model_used=response.model_used
+                )
+        return response
 
 
 # Singleton instance